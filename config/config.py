@@ -27,6 +27,24 @@ class Config(object):
     
     # Database settings
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQL_QUERY_BUDGET_STRICT = False  # log instead of raising when a view exceeds its query budget
+    SQL_N_PLUS_ONE_THRESHOLD = 5  # repeats of one statement shape per request before it is flagged
+    SQL_N_PLUS_ONE_STRICT = False  # log instead of raising when a possible N+1 is flagged
+    SERVER_TIMING_ENABLED = True  # report per-request DB time and query count in Server-Timing
+    
+    # Slow query log: statements over the threshold are written with their plan
+    # to logs/slow_queries.jsonl (or SLOW_QUERY_LOG_FILE) and kept for the admin API
+    SLOW_QUERY_LOG_ENABLED = os.getenv('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_EXPLAIN = True  # capture EXPLAIN (ANALYZE off) in a background thread
+    SLOW_QUERY_LOG_FILE = os.getenv('SLOW_QUERY_LOG_FILE')
+    SLOW_QUERY_LOG_MAX_BYTES = 10000000
+    SLOW_QUERY_LOG_BACKUP_COUNT = 5
+    SLOW_QUERY_BUFFER_SIZE = 200  # most recent entries kept per worker
+    DASHBOARD_PAGE_SIZE = 50  # tasks per dashboard page; further pages load on scroll
+    TASK_BATCH_MAX_OPERATIONS = 500  # operations accepted per /api/tasks/batch request
+    TASK_ARCHIVE_AFTER_DAYS = int(os.getenv('TASK_ARCHIVE_AFTER_DAYS', 90))  # completed tasks untouched this long move to tasks_archive
+    TASK_ARCHIVE_BATCH_SIZE = 1000  # tasks moved per transaction by `flask archive-tasks`
     
     # Default PostgreSQL URI
     SQLALCHEMY_DATABASE_URI = os.getenv(
@@ -34,12 +52,49 @@ class Config(object):
         f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('POSTGRES_HOST')}:{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}"
     )
     
+    # Schema migrations: startup only checks the version unless DB_AUTO_UPGRADE is set
+    DB_AUTO_UPGRADE = os.getenv('DB_AUTO_UPGRADE', 'false').lower() == 'true'
+    MIGRATION_LOCK_TIMEOUT = os.getenv('MIGRATION_LOCK_TIMEOUT', '5s')  # Postgres lock_timeout for DDL
+    
+    # Read replicas (comma-separated URIs); safe requests read from them unless
+    # the user wrote within REPLICA_STICKY_SECONDS or the replica is behind.
+    # The sticky window is never shorter than REPLICA_MAX_LAG
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in os.getenv('DATABASE_REPLICA_URIS', '').split(',') if uri.strip()]
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 10))
+    REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 10))  # seconds
+    REPLICA_LAG_CHECK_INTERVAL = 5  # seconds between lag checks per replica
+    REPLICA_BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before skipping a replica
+    REPLICA_BREAKER_COOLDOWN = 30  # seconds to skip a replica after its breaker opens
+    
     # Redis settings
     REDIS_URL = os.getenv('REDIS_URL')
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.5))  # seconds
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', 0.5))  # seconds
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    REDIS_BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before skipping Redis
+    REDIS_BREAKER_COOLDOWN = 30  # seconds to skip Redis after the breaker opens
+    REDIS_HEALTH_CHECK_TTL = 5  # seconds a /health PING result is reused
     CACHE_TYPE = 'redis'
     CACHE_REDIS_URL = REDIS_URL
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
     
+    # In-process LRU tier in front of Redis (per worker)
+    CACHE_LOCAL_ENABLED = os.getenv('CACHE_LOCAL_ENABLED', 'true').lower() == 'true'
+    CACHE_LOCAL_MAXSIZE = int(os.getenv('CACHE_LOCAL_MAXSIZE', 1024))
+    CACHE_LOCAL_TTL = 30  # seconds
+    CACHE_LOCAL_GENERATION_TTL = 5  # seconds, fallback if an invalidation message is missed
+    CACHE_INVALIDATION_CHANNEL = 'taskflow:cache:invalidate'
+    
+    # Cached payload encoding: msgpack and lz4 are in requirements.txt; if either is
+    # missing, startup logs a warning and falls back to 'json' / 'zlib'.
+    # Payloads below the threshold stay uncompressed
+    CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'msgpack')
+    CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'zlib')
+    CACHE_COMPRESSION_THRESHOLD = 1024  # bytes
+    
+    # Overwrite a task's cached payload after a write instead of invalidating it
+    CACHE_WRITE_THROUGH = os.getenv('CACHE_WRITE_THROUGH', 'true').lower() == 'true'
+    
     # Security headers
     SECURITY_HEADERS = {
         'X-Content-Type-Options': 'nosniff',
@@ -92,6 +147,9 @@ class Development(Config):
     # Logging
     LOG_LEVEL = 'DEBUG'
     
+    # Apply pending migrations at startup
+    DB_AUTO_UPGRADE = True
+    
     # Enable debug toolbar if installed
     DEBUG_TB_ENABLED = True
     DEBUG_TB_INTERCEPT_REDIRECTS = False
@@ -114,12 +172,19 @@ class Testing(Config):
     # Use faster hashing for tests
     BCRYPT_LOG_ROUNDS = 4
     
+    # Fail tests when a view exceeds its SQL query budget or runs an N+1 pattern
+    SQL_QUERY_BUDGET_STRICT = True
+    SQL_N_PLUS_ONE_STRICT = True
+    
     # Disable rate limiting for tests
     RATELIMIT_ENABLED = False
     
     # Use memory cache for tests
     CACHE_TYPE = 'simple'
     
+    # Build the schema from the migrations at startup
+    DB_AUTO_UPGRADE = True
+    
     # Logging
     LOG_LEVEL = 'DEBUG'
 
@@ -142,6 +207,9 @@ class Production(Config):
     WTF_CSRF_ENABLED = True
     BCRYPT_LOG_ROUNDS = 13
     
+    # Do not reveal backend timings to clients
+    SERVER_TIMING_ENABLED = False
+    
     # Use secure cookies in production
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
@@ -0,0 +1,81 @@
+"""Initial schema
+
+Revision ID: 0001_initial_schema
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=128), nullable=False),
+    sa.Column('email_id', sa.String(length=128), nullable=False),
+    sa.Column('password', sa.String(length=512), nullable=False),
+    sa.Column('created_on', sa.DateTime(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('role', sa.String(length=20), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email_id'), 'users', ['email_id'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('color', sa.String(length=7), nullable=True),
+    sa.Column('icon', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=140), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('priority', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_task_category_status', 'tasks', ['category_id', 'status'], unique=False)
+    op.create_index('idx_task_due_date', 'tasks', ['due_date'], unique=False)
+    op.create_index('idx_task_priority', 'tasks', ['priority'], unique=False)
+    op.create_index('idx_task_status', 'tasks', ['status'], unique=False)
+    op.create_index('idx_task_user_status', 'tasks', ['user_id', 'status'], unique=False)
+    op.create_index(op.f('ix_tasks_category_id'), 'tasks', ['category_id'], unique=False)
+    op.create_index(op.f('ix_tasks_user_id'), 'tasks', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_tasks_user_id'), table_name='tasks')
+    op.drop_index(op.f('ix_tasks_category_id'), table_name='tasks')
+    op.drop_index('idx_task_user_status', table_name='tasks')
+    op.drop_index('idx_task_status', table_name='tasks')
+    op.drop_index('idx_task_priority', table_name='tasks')
+    op.drop_index('idx_task_due_date', table_name='tasks')
+    op.drop_index('idx_task_category_status', table_name='tasks')
+    op.drop_table('tasks')
+    op.drop_table('categories')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_email_id'), table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,76 @@
+"""Add tasks.priority_rank and composite indexes for the task list sorts
+
+Revision ID: 0002_task_priority_rank
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_task_priority_rank'
+down_revision = '0001_initial_schema'
+branch_labels = None
+depends_on = None
+
+# Copied from Task.PRIORITY_RANKS; migrations must not import the models
+PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3}
+DEFAULT_PRIORITY_RANK = 2
+BACKFILL_BATCH_SIZE = 10000
+
+NEW_INDEXES = [
+    ('idx_task_user_due', ['user_id', 'due_date', 'id']),
+    ('idx_task_user_created', ['user_id', 'created_at', 'id']),
+    ('idx_task_user_status_due', ['user_id', 'status', 'due_date']),
+    ('idx_task_user_priority_due', ['user_id', 'priority_rank', 'due_date']),
+]
+
+# Left-prefixes of the new indexes, or superseded by priority_rank
+OLD_INDEXES = [
+    ('idx_task_user_status', ['user_id', 'status']),
+    ('idx_task_priority', ['priority']),
+    ('ix_tasks_user_id', ['user_id']),
+]
+
+
+def upgrade():
+    # A constant server default makes this a metadata-only change on Postgres 11+
+    op.add_column('tasks', sa.Column(
+        'priority_rank', sa.SmallInteger(), nullable=False, server_default=str(DEFAULT_PRIORITY_RANK)
+    ))
+
+    # Only rows whose rank differs from the default need rewriting. Each id
+    # range is its own short transaction, so a live table is never locked
+    # row by row for the length of the whole backfill
+    tasks = sa.table('tasks', sa.column('id', sa.Integer), sa.column('priority', sa.String),
+                     sa.column('priority_rank', sa.SmallInteger))
+    ranks = {priority: rank for priority, rank in PRIORITY_RANKS.items() if rank != DEFAULT_PRIORITY_RANK}
+    max_id = op.get_bind().execute(sa.select(sa.func.max(tasks.c.id))).scalar() or 0
+    with op.get_context().autocommit_block():
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            op.execute(
+                tasks.update()
+                .where(tasks.c.id >= start, tasks.c.id < start + BACKFILL_BATCH_SIZE, tasks.c.priority.in_(list(ranks)))
+                .values(priority_rank=sa.case(ranks, value=tasks.c.priority))
+            )
+
+    # Build indexes without blocking writes on Postgres (CONCURRENTLY cannot run in a transaction)
+    with op.get_context().autocommit_block():
+        for name, columns in NEW_INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+        for name, _ in OLD_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, columns in OLD_INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+        for name, _ in NEW_INDEXES:
+            op.drop_index(name, table_name='tasks', if_exists=True, postgresql_concurrently=True)
+
+    op.drop_column('tasks', 'priority_rank')
@@ -0,0 +1,86 @@
+"""Add full-text search: tasks.search_vector on Postgres, tasks_fts on SQLite
+
+Revision ID: 0003_task_search
+Revises: 0002_task_priority_rank
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_task_search'
+down_revision = '0002_task_priority_rank'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Copied from tasks.models.SEARCH_DDL; migrations must not import the models
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+POSTGRES_DDL = [
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    f"NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')}; RETURN NEW; END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER tasks_search_vector_update BEFORE INSERT OR UPDATE OF title, description ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()",
+]
+POSTGRES_INDEX = "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_task_search ON tasks USING GIN (search_vector)"
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # A nullable column without a default is a metadata-only change; a
+        # generated STORED column would rewrite the table under an exclusive lock
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+        # The trigger covers new writes; fill in the existing rows one id range
+        # per transaction, as in 0002
+        tasks = sa.table('tasks', sa.column('id', sa.Integer))
+        max_id = op.get_bind().execute(sa.select(sa.func.max(tasks.c.id))).scalar() or 0
+        with op.get_context().autocommit_block():
+            for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+                op.execute(
+                    f"UPDATE tasks SET search_vector = {SEARCH_VECTOR.format(row='')} "
+                    f"WHERE id >= {start} AND id < {start + BACKFILL_BATCH_SIZE} AND search_vector IS NULL"
+                )
+            op.execute(POSTGRES_INDEX)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Index the rows that existed before the triggers
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_task_search")
+        op.execute("DROP TRIGGER IF EXISTS tasks_search_vector_update ON tasks")
+        op.execute("DROP FUNCTION IF EXISTS tasks_search_vector_update()")
+        op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,43 @@
+"""Add user_task_stats, per-user task counters by status, priority and category
+
+Revision ID: 0004_user_task_stats
+Revises: 0003_task_search
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_user_task_stats'
+down_revision = '0003_task_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older versions of the app created missing tables at startup, so it may already exist (empty)
+    if not sa.inspect(op.get_bind()).has_table('user_task_stats'):
+        op.create_table(
+            'user_task_stats',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('priority', sa.String(length=20), nullable=False),
+            sa.Column('category_id', sa.Integer(), nullable=False),
+            sa.Column('task_count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id', 'status', 'priority', 'category_id')
+        )
+
+    # Count the existing tasks; 0 stands for "no category"
+    op.execute("DELETE FROM user_task_stats")
+    op.execute(
+        "INSERT INTO user_task_stats (user_id, status, priority, category_id, task_count) "
+        "SELECT user_id, status, priority, COALESCE(category_id, 0), COUNT(*) FROM tasks "
+        "GROUP BY user_id, status, priority, COALESCE(category_id, 0)"
+    )
+
+
+def downgrade():
+    op.drop_table('user_task_stats')
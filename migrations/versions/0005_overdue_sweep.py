@@ -0,0 +1,72 @@
+"""Add open-task partial indexes, overdue_events and sweep_marks
+
+Revision ID: 0005_overdue_sweep
+Revises: 0004_user_task_stats
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_overdue_sweep'
+down_revision = '0004_user_task_stats'
+branch_labels = None
+depends_on = None
+
+# Only open tasks are indexed; completed ones make up most of a long-lived table
+PARTIAL_INDEXES = [
+    "CREATE INDEX {concurrently}IF NOT EXISTS idx_task_user_open_due ON tasks (user_id, due_date) "
+    "WHERE status != 'completed'",
+    "CREATE INDEX {concurrently}IF NOT EXISTS idx_task_open_due ON tasks (due_date) "
+    "WHERE status != 'completed'",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for statement in PARTIAL_INDEXES:
+                op.execute(statement.format(concurrently='CONCURRENTLY '))
+    else:
+        for statement in PARTIAL_INDEXES:
+            op.execute(statement.format(concurrently=''))
+
+    # Older versions of the app created missing tables at startup, so these may already exist
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('sweep_marks'):
+        op.create_table(
+            'sweep_marks',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('high_water', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+    if not inspector.has_table('overdue_events'):
+        op.create_table(
+            'overdue_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('due_date', sa.DateTime(), nullable=False),
+            sa.Column('detected_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('task_id', 'due_date', name='uq_overdue_task_due')
+        )
+        op.create_index('idx_overdue_user_event', 'overdue_events', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('overdue_events')
+    op.drop_table('sweep_marks')
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_task_open_due")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_task_user_open_due")
+    else:
+        op.execute("DROP INDEX IF EXISTS idx_task_open_due")
+        op.execute("DROP INDEX IF EXISTS idx_task_user_open_due")
@@ -0,0 +1,55 @@
+"""Add tasks_archive, the cold tier for old completed tasks
+
+Revision ID: 0006_tasks_archive
+Revises: 0005_overdue_sweep
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_tasks_archive'
+down_revision = '0005_overdue_sweep'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Older versions of the app created missing tables at startup, so it may already exist (empty)
+    if sa.inspect(op.get_bind()).has_table('tasks_archive'):
+        return
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=140), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=False),
+        sa.Column('priority_rank', sa.SmallInteger(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_task_archive_user_due', 'tasks_archive', ['user_id', 'due_date', 'id'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_category_id'), 'tasks_archive', ['category_id'], unique=False)
+
+
+def downgrade():
+    # Archived tasks go back to the hot table rather than being lost
+    op.execute(
+        "INSERT INTO tasks (id, title, description, due_date, priority, priority_rank, status, "
+        "user_id, category_id, created_at, updated_at) "
+        "SELECT id, title, description, due_date, priority, priority_rank, status, "
+        "user_id, category_id, created_at, updated_at FROM tasks_archive"
+    )
+    op.drop_index(op.f('ix_tasks_archive_category_id'), table_name='tasks_archive')
+    op.drop_index('idx_task_archive_user_due', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
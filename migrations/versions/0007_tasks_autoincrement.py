@@ -0,0 +1,56 @@
+"""Never reuse task ids on SQLite, so archived ids stay unique
+
+Revision ID: 0007_tasks_autoincrement
+Revises: 0006_tasks_archive
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_tasks_autoincrement'
+down_revision = '0006_tasks_archive'
+branch_labels = None
+depends_on = None
+
+# Copied from 0003_task_search; rebuilding the table drops its triggers
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+
+def _rebuild_tasks(autoincrement):
+    # SQLite can only add or remove AUTOINCREMENT by copying the table
+    with op.batch_alter_table('tasks', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in SQLITE_FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    # Postgres ids come from a sequence, which never hands an id out twice
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_tasks(True)
+    # Without AUTOINCREMENT, archiving the newest task freed its id for reuse;
+    # start the sequence above every id in either table
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', max(coalesce((SELECT max(id) FROM tasks), 0), "
+        "coalesce((SELECT max(id) FROM tasks_archive), 0))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_tasks(False)
@@ -17,15 +17,16 @@ from flask_limiter.util import get_remote_address
 from flask_compress import Compress
 from flask_talisman import Talisman
 from src.task_management.db import db, init_app as init_db, check_redis
+from src.task_management import slow_queries
 from sqlalchemy import text
 
 #from src.task_management.auth.models import User
-from src.task_management.auth.routes import auth_bp
+from src.task_management.auth.routes import auth_bp, token_required
 from src.task_management.tasks.routes import task_bp
 
 from src.task_management.categories.views import categories_bp
 from src.task_management.integration.slack import SlackNotifier
-from src.task_management.cache.redis_client import cache_data, invalidate_cache, init_redis
+from src.task_management.cache.redis_client import cache_data, invalidate_cache, init_redis, get_connection_pool
 from config.config import config_by_name, get_config
 from flask_login import current_user
 #from src.task_management.categories.models import Category
@@ -63,63 +64,51 @@ def setup_bullet_navigation_fix(app):
         return response
     
     return remove_bullet_navigation
-def register_context_processors(app):
-    """
-    Register context processors for templates.
-    """
-    @app.context_processor
-    def inject_categories():
-        from src.task_management.categories.models import Category
-        if hasattr(current_user, 'is_authenticated') and current_user.is_authenticated:
-            try:
-                return {'all_categories': Category.query.filter_by(user_id=current_user.id).all()}
-            except Exception as e:
-                app.logger.error(f"Error loading categories for context: {str(e)}")
-                return {'all_categories': []}
-        return {'all_categories': []}
-
 def init_database(app):
     """
-    Initialize the database with required tables if they don't exist.
-    
+    Check the database schema version at startup.
+    The schema is owned by the Alembic migrations in migrations/, so this is a
+    single SELECT of alembic_version. A database that is behind is upgraded
+    when DB_AUTO_UPGRADE is set (development and testing); elsewhere run
+    `flask db upgrade` as a release step before starting the workers.
     """
+    from src.task_management.db import schema_revisions, upgrade_schema
     
     with app.app_context():
-        app.logger.info("Checking database tables...")
-    
+        try:
+            current, heads = schema_revisions()
+        except Exception as e:
+            app.logger.error(f"Error checking database schema: {str(e)}")
+            return
+        
+        if current in heads:
+            app.logger.info(f"Database schema is up to date ({current}).")
+            return
+        
+        if current is None and db.inspect(db.engine).has_table('users'):
+            app.logger.error(
+                "Database has tables but no migration version. Stamp the revision it matches "
+                "(e.g. `flask db stamp 0001_initial_schema`), then run `flask db upgrade`."
+            )
+            return
+        
+        if not app.config.get('DB_AUTO_UPGRADE', False):
+            app.logger.error(
+                f"Database schema is at {current or 'no revision'}, expected {', '.join(sorted(heads))}. "
+                "Run `flask db upgrade`."
+            )
+            return
         
-        # Check if we need to create tables
         try:
-            inspector = db.inspect(db.engine)
-            tables_exist = inspector.get_table_names()
-            
-            if not tables_exist:
-                app.logger.info("No tables found. Creating all tables...")
-                db.create_all()
-                app.logger.info("Database tables created successfully.")
-                create_default_data(app)
-            else:
-                app.logger.info("Database tables already exist.")
-                
-                # Check for specific tables and their columns
-                if 'users' in tables_exist:
-                    columns = inspector.get_columns('users')
-                    for column in columns:
-                        if column['name'] == 'password':
-                            # If password column is too small, we need to migrate data
-                            if hasattr(column['type'], 'length') and column['type'].length < 512:
-                                app.logger.warning("Password column is too small. Consider running a migration.")
-                                # Note: Actual column alteration would require Alembic migrations
-                
+            app.logger.info(f"Upgrading database schema from {current or 'an empty database'}...")
+            upgrade_schema()
+            app.logger.info("Database schema upgraded successfully.")
         except Exception as e:
-            app.logger.error(f"Error checking database: {str(e)}")
-            # Try to create all tables as a fallback
-            try:
-                db.create_all()
-                app.logger.info("Database tables created successfully after error.")
-                create_default_data(app)
-            except Exception as inner_e:
-                app.logger.error(f"Failed to create database tables: {str(inner_e)}")
+            app.logger.error(f"Failed to upgrade database schema: {str(e)}")
+            return
+        
+        if current is None:
+            create_default_data(app)
 
 def create_default_data(app):
     """
@@ -168,12 +157,9 @@ def create_web_app(config_name=None):
     # Initialize extensions
     init_extensions(app)
 
-    # Initialize database tables
+    # Check the schema version (and upgrade it where allowed)
     init_database(app)
     
-    # Register context processors
-    register_context_processors(app)
-
     # Setup bullet navigation fix
     setup_bullet_navigation_fix(app)
     
@@ -209,6 +195,9 @@ def configure_logging(app):
     app.logger.addHandler(handler)
     app.logger.setLevel(log_level)
     app.logger.info('TaskFlow startup')
+    
+    # Slow SQL statements go to their own JSONL file next to app.log
+    slow_queries.init_slow_query_log(app, os.path.join(log_directory, 'slow_queries.jsonl'))
 
 def init_extensions(app):
     """
@@ -221,13 +210,14 @@ def init_extensions(app):
     init_db(app)
 
     with app.app_context():
-        # Import models here to ensure they're registered
+        # Import models here to ensure they're registered; the tables
+        # themselves are created by the migrations (see init_database)
         from src.task_management.auth.models import User
         from src.task_management.tasks.models import Task
         from src.task_management.categories.models import Category
-        
-        # Ensure all tables exist
-        db.create_all()
+        from src.task_management.tasks.counters import UserTaskStat
+        from src.task_management.tasks.overdue import OverdueEvent, SweepMark
+        from src.task_management.tasks.archive import TaskArchive
     
     # Initialize Redis cache
     init_redis(app)
@@ -261,12 +251,15 @@ def init_extensions(app):
     # Initialize Flask-Compress for response compression
     Compress(app)
     
-    # Initialize Flask-Limiter for rate limiting
+    # Initialize Flask-Limiter for rate limiting, sharing the cache's Redis pool
+    connection_pool = get_connection_pool()
     Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=["1000 per day", "200 per hour"],
-        storage_uri=app.config.get('REDIS_URL')
+        storage_uri=app.config.get('REDIS_URL') if connection_pool else None,
+        storage_options={"connection_pool": connection_pool} if connection_pool else {},
+        in_memory_fallback_enabled=True
     )
     
     # Initialize Talisman for security headers (if not in development)
@@ -354,8 +347,9 @@ def register_middlewares(app):
         for header, value in app.config.get('SECURITY_HEADERS', {}).items():
             response.headers.setdefault(header, value)
         
-        # Set cache control headers for API responses
-        if request.path.startswith('/api/'):
+        # Set cache control headers for API responses; responses carrying an
+        # ETag are private and revalidatable instead of uncacheable
+        if request.path.startswith('/api/') and not response.headers.get('ETag'):
             response.headers.setdefault('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
             response.headers.setdefault('Pragma', 'no-cache')
             response.headers.setdefault('Expires', '0')
@@ -403,6 +397,23 @@ def register_commands(app):
         for line in sorted(output):
             print(line)
 
+    @app.cli.command("cache-stats")
+    def cache_stats():
+        """Show cache hit, stampede-protection and payload size counters"""
+        from src.task_management.cache.redis_client import get_cache_stats, get_payload_stats
+        stats = get_cache_stats()
+        for scope in ('worker', 'cluster'):
+            print(f"[{scope}]")
+            for name, value in sorted(stats[scope].items()):
+                print(f"  {name:25s} {value}")
+        
+        print("[payloads]")
+        for prefix, sizes in sorted(get_payload_stats().items()):
+            serialized = sizes.get('serialized_bytes', 0)
+            stored = sizes.get('stored_bytes', 0)
+            saved = 100 - int(stored * 100 / serialized) if serialized else 0
+            print(f"  {prefix:25s} writes={sizes.get('writes', 0)} serialized={serialized} stored={stored} saved={saved}%")
+
 # Create the application instance
 app = create_web_app()
 
@@ -436,6 +447,26 @@ def health_check():
     }
     return jsonify(health_status)
 
+# Slow query log inspection
+@app.route('/api/admin/slow-queries')
+@token_required
+def admin_slow_queries(current_user):
+    """
+    Return this worker's most recent slow statements, newest first (admins only).
+    """
+    if not current_user.is_admin():
+        return jsonify({"error": "Admin access required"}), 403
+    
+    log = slow_queries.slow_query_log
+    if log is None:
+        return jsonify({"error": "The slow query log is disabled"}), 404
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), log.entries.maxlen)
+    return jsonify({
+        "threshold_ms": log.threshold * 1000,
+        "entries": log.recent(limit)
+    }), 200
+
 if __name__ == "__main__":
     # Get port from environment or use default
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,77 @@
+# src/task_management/cache/circuit_breaker.py
+"""
+Circuit breaker for TaskFlow's Redis connection.
+After a number of consecutive connection failures the breaker opens and
+callers skip Redis entirely for a cooldown window. Once the window elapses a
+single trial call is let through; its outcome closes or re-opens the breaker.
+"""
+import threading
+import time
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=3, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """
+        Return True if a call may be attempted now.
+        """
+        if self._opened_at is None:
+            return True
+
+        with self._lock:
+            if self.state != self.HALF_OPEN or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """
+        Close the breaker after a successful call.
+        """
+        if self._opened_at is None and self._failures == 0:
+            return
+
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """
+        End a half-open trial call, whatever its outcome, so a trial that
+        recorded neither success nor failure cannot block later ones.
+        """
+        if self._trial_in_flight:
+            with self._lock:
+                self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Count a failed call and open the breaker once the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
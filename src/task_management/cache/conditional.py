@@ -0,0 +1,71 @@
+# src/task_management/cache/conditional.py
+"""
+HTTP conditional GET support for TaskFlow's API.
+Validators are derived from the cache namespace generations, so deciding
+whether a client's copy is still current costs no database query and, with
+the in-process tier, usually no Redis round-trip either. A generation lost
+to a flush or eviction restarts from the clock rather than from 0, so an
+ETag is never issued again for different content. When Redis is
+unavailable the caller's fallback supplies (count, max updated_at) pairs
+from the database instead, which also yields a Last-Modified date.
+"""
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+from . import redis_client as redis_cache
+
+def compute_validators(user_id, namespaces, fallback=None):
+    """
+    Return (etag, last_modified) for the current request and user.
+    Either value may be None when it cannot be determined.
+    """
+    parts = [str(user_id), request.path, request.query_string.decode()]
+    last_modified = None
+
+    generations = redis_cache.current_generations(namespaces)
+    if generations is not None:
+        parts.append('g' + '.'.join(str(generation) for generation in generations))
+    elif fallback is not None:
+        for count, updated_at in fallback():
+            parts.append(f"{count}@{updated_at.isoformat() if updated_at else ''}")
+            if updated_at and (last_modified is None or updated_at > last_modified):
+                last_modified = updated_at
+    else:
+        return None, None
+
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return etag, last_modified
+
+def is_not_modified(etag, last_modified):
+    """
+    Evaluate If-None-Match (preferred) or If-Modified-Since against the validators.
+    """
+    if etag is None:
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+def apply_validators(response, etag, last_modified):
+    """
+    Attach validators and mark the response private and revalidatable.
+    """
+    if etag is None:
+        return response
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+def not_modified(etag, last_modified):
+    """
+    Build an empty 304 response carrying the current validators.
+    """
+    return apply_validators(make_response('', 304), etag, last_modified)
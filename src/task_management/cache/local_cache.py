@@ -0,0 +1,97 @@
+# src/task_management/cache/local_cache.py
+"""
+In-process cache tier for TaskFlow.
+This module provides a small, thread-safe LRU cache with per-entry TTLs that
+each worker keeps in front of Redis. Entries can be tagged with the cache
+namespaces they were built from so they can be dropped when a namespace
+generation is bumped by any worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class LocalCache:
+    """
+    Size-bounded LRU cache with per-entry expiry.
+    Values are returned as stored, so callers must treat them as read-only.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value, namespaces)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, namespaces=None):
+        """
+        Store a value, evicting the least recently used entries when full.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value, tuple(namespaces or ()))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def set_max(self, key, value, ttl=None):
+        """
+        Store value unless a larger unexpired value is already cached, and
+        return whichever is kept. Used for counters that only move forward,
+        so a late or out-of-order update never lowers them.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            now = time.monotonic()
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now and entry[1] >= value:
+                value = entry[1]
+            self._data[key] = (now + ttl, value, entry[2] if entry is not None else ())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
+
+    def delete(self, key):
+        """
+        Remove a single entry if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def evict_namespaces(self, namespaces):
+        """
+        Remove every entry tagged with any of the given namespaces.
+        """
+        namespaces = set(namespaces)
+        with self._lock:
+            stale = [key for key, (_, _, tags) in self._data.items() if namespaces.intersection(tags)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._data.clear()
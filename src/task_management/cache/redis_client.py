@@ -5,41 +5,566 @@ This module provides functions for caching and cache invalidation.
 """
 import redis
 import json
-from functools import wraps
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import partial, wraps
 import logging
+import re
+from .local_cache import LocalCache
+from .serializers import PayloadCodec, build_codec
+from .circuit_breaker import CircuitBreaker
 
 # Initialize Redis client
 redis_client = None
+connection_pool = None
 logger = logging.getLogger(__name__)
 
+# Health of the shared connection, checked at most every health_check_ttl seconds
+health_check_ttl = 5
+_last_health_check = (0.0, False)
+
+# Optional per-worker tier in front of Redis, kept coherent through pub/sub
+local_cache = None
+local_generations = None
+invalidation_channel = 'taskflow:cache:invalidate'
+_subscriber = None
+_subscriber_pid = None
+_worker_id = uuid.uuid4().hex
+
+# Serializer and compression used for cached payloads
+codec = PayloadCodec()
+
+# Cache activity counters for this worker; stampede counters are mirrored in Redis
+cache_stats = Counter()
+_stats_lock = threading.Lock()
+STATS_KEY = 'cache:stats'
+SHARED_STATS = ('recomputations', 'early_recomputations', 'coalesced_waits', 'coalesced_stale', 'lock_timeouts')
+PAYLOAD_STATS_KEY = 'cache:payload_stats'
+
+# Release a single-flight lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class CircuitOpenError(redis.ConnectionError):
+    """
+    Raised instead of contacting Redis while the circuit breaker is open.
+    """
+
+_CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+class GuardedPipeline(redis.client.Pipeline):
+    """
+    Pipeline that reports its outcome to the owning client's circuit breaker.
+    """
+    breaker = None
+
+    def execute(self, raise_on_error=True):
+        if not self.breaker.allow():
+            self.reset()
+            raise CircuitOpenError("Redis circuit breaker is open")
+        try:
+            result = super().execute(raise_on_error)
+        except _CONNECTION_ERRORS:
+            self.breaker.record_failure()
+            raise
+        except redis.RedisError:
+            # An error reply (script error, OOM, ...) still means Redis is reachable
+            self.breaker.record_success()
+            raise
+        finally:
+            self.breaker.release_trial()
+        self.breaker.record_success()
+        return result
+
+class GuardedRedis(redis.Redis):
+    """
+    Redis client that fails fast while its circuit breaker is open.
+    """
+
+    def __init__(self, *args, breaker=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker or CircuitBreaker()
+
+    def execute_command(self, *args, **options):
+        if not self.breaker.allow():
+            raise CircuitOpenError("Redis circuit breaker is open")
+        try:
+            result = super().execute_command(*args, **options)
+        except _CONNECTION_ERRORS:
+            self.breaker.record_failure()
+            raise
+        except redis.RedisError:
+            # An error reply (script error, OOM, ...) still means Redis is reachable
+            self.breaker.record_success()
+            raise
+        finally:
+            self.breaker.release_trial()
+        self.breaker.record_success()
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = GuardedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.breaker = self.breaker
+        return pipe
+
 def init_redis(app):
     """
-    Initialize Redis client with the Flask app configuration.
+    Initialize the shared Redis connection pool and client with the Flask app
+    configuration. The pool is also handed to Flask-Limiter so every
+    subsystem shares the same connections, socket timeouts and breaker.
 
     """
-    global redis_client
+    global redis_client, connection_pool, codec, health_check_ttl, _last_health_check
     
-    redis_url = app.config.get('REDIS_URL', 'redis://localhost:6379/0')
-    try:
-        redis_client = redis.from_url(redis_url)
-        # Test the connection
-        redis_client.ping()
-        logger.info("Redis connection established successfully")
-    except redis.ConnectionError:
-        logger.warning("Redis connection failed - caching will be disabled")
+    codec = build_codec(app.config)
+    health_check_ttl = app.config.get('REDIS_HEALTH_CHECK_TTL', health_check_ttl)
+    _last_health_check = (0.0, False)
+    
+    redis_url = app.config.get('REDIS_URL')
+    if not redis_url:
+        logger.warning("REDIS_URL is not configured - caching will be disabled")
         redis_client = None
+        connection_pool = None
+        init_local_cache(app)
+        return
+    
+    try:
+        connection_pool = redis.ConnectionPool.from_url(
+            redis_url,
+            socket_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 0.5),
+            socket_connect_timeout=app.config.get('REDIS_SOCKET_CONNECT_TIMEOUT', 0.5),
+            max_connections=app.config.get('REDIS_MAX_CONNECTIONS', 50),
+            health_check_interval=30
+        )
+        redis_client = GuardedRedis(
+            connection_pool=connection_pool,
+            breaker=CircuitBreaker(
+                failure_threshold=app.config.get('REDIS_BREAKER_FAILURE_THRESHOLD', 3),
+                cooldown=app.config.get('REDIS_BREAKER_COOLDOWN', 30)
+            )
+        )
+        # Test the connection; on failure the breaker opens and callers skip Redis
+        if check_redis(force=True):
+            logger.info("Redis connection established successfully")
+        else:
+            logger.warning("Redis connection failed - caching is bypassed until it recovers")
     except Exception as e:
         logger.error(f"Redis initialization error: {str(e)}")
         redis_client = None
+        connection_pool = None
+    
+    init_local_cache(app)
+
+def get_connection_pool():
+    """
+    Return the shared Redis connection pool, or None if Redis is not configured.
+    """
+    return connection_pool
+
+def redis_available():
+    """
+    Return True if Redis is configured and the circuit breaker allows calls.
+    This costs no network round-trip.
+    """
+    return redis_client is not None and redis_client.breaker.state != CircuitBreaker.OPEN
+
+def init_local_cache(app):
+    """
+    Initialize the in-process LRU tier if enabled in the app configuration.
+    """
+    global local_cache, local_generations, invalidation_channel
+    
+    if redis_client is None or not app.config.get('CACHE_LOCAL_ENABLED', False):
+        local_cache = None
+        local_generations = None
+        return
+    
+    local_cache = LocalCache(
+        maxsize=app.config.get('CACHE_LOCAL_MAXSIZE', 1024),
+        ttl=app.config.get('CACHE_LOCAL_TTL', 30)
+    )
+    # Generations are cached briefly as a safety net for missed pub/sub messages
+    local_generations = LocalCache(
+        maxsize=app.config.get('CACHE_LOCAL_MAXSIZE', 1024),
+        ttl=app.config.get('CACHE_LOCAL_GENERATION_TTL', 5)
+    )
+    invalidation_channel = app.config.get('CACHE_INVALIDATION_CHANNEL', invalidation_channel)
+    logger.info("In-process cache tier enabled")
+
+def _publish_invalidation(generations=None, keys=None):
+    """
+    Tell other workers to refresh generations and drop overwritten keys.
+    """
+    message = {"origin": _worker_id, "generations": generations or {}, "keys": keys or []}
+    redis_client.publish(invalidation_channel, json.dumps(message))
+
+def _handle_invalidation(message):
+    """
+    Apply a generation bump or key overwrite published by any worker to the local tier.
+    """
+    try:
+        message = json.loads(message['data'])
+        generations = message.get("generations", {})
+        keys = message.get("keys", [])
+    except (AttributeError, TypeError, ValueError):
+        return
+    
+    for namespace, generation in generations.items():
+        local_generations.set_max(namespace, generation)
+    local_cache.evict_namespaces(generations.keys())
+    
+    # Our own write-through values are already current in this worker
+    if message.get("origin") != _worker_id:
+        for key in keys:
+            local_cache.delete(key)
+
+def _subscriber_error(error, pubsub, thread):
+    """
+    Stop a failed pub/sub listener so the next cache lookup restarts it.
+    Locally cached generations expire on their own in the meantime.
+    """
+    global _subscriber_pid
+    
+    logger.warning(f"Cache invalidation listener stopped: {str(error)}")
+    thread.stop()
+    _subscriber_pid = None
+
+def _ensure_subscriber():
+    """
+    Start the pub/sub listener for this worker process.
+    The check on the pid restarts it in workers forked after app creation.
+    """
+    global _subscriber, _subscriber_pid
+    
+    if _subscriber_pid == os.getpid():
+        return
+    
+    _subscriber_pid = os.getpid()
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{invalidation_channel: _handle_invalidation})
+        _subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=_subscriber_error)
+    except Exception as e:
+        logger.error(f"Error subscribing to cache invalidations: {str(e)}")
+        _subscriber = None
+        _subscriber_pid = None
+
+def generation_key(namespace):
+    """
+    Build the Redis key holding the generation counter of a cache namespace.
+    """
+    return f"gen:{namespace}"
+
+def _initial_generation():
+    # Microseconds since the Unix epoch, so a counter lost to FLUSHDB, a purge
+    # or eviction restarts above every value it had and old keys and ETags
+    # are never reused
+    return time.time_ns() // 1000
+
+def _fetch_generations(namespaces):
+    """
+    Read the generation counters of the namespaces with a single MGET.
+    Missing counters are created with SET NX so every worker agrees on them.
+    """
+    keys = [generation_key(ns) for ns in namespaces]
+    values = redis_client.mget(keys)
+    missing = [key for key, value in zip(keys, values) if value is None]
+    if missing:
+        initial = _initial_generation()
+        pipe = redis_client.pipeline(transaction=True)
+        for key in missing:
+            pipe.set(key, initial, nx=True)
+            pipe.get(key)
+        created = dict(zip(missing, pipe.execute()[1::2]))
+        values = [created[key] if value is None else value for key, value in zip(keys, values)]
+    return [int(value) for value in values]
+
+def get_generations(namespaces):
+    """
+    Fetch the current generation of each namespace, normally with a single MGET.
+    With the local tier enabled, known generations are served from memory.
+    """
+    if not namespaces:
+        return []
+    
+    if local_generations is None:
+        return _fetch_generations(namespaces)
+    
+    _ensure_subscriber()
+    generations = [local_generations.get(ns) for ns in namespaces]
+    missing = [ns for ns, generation in zip(namespaces, generations) if generation is None]
+    if missing:
+        fetched = dict(zip(missing, _fetch_generations(missing)))
+        # A bump may have been applied while the MGET was in flight
+        for namespace, generation in fetched.items():
+            fetched[namespace] = local_generations.set_max(namespace, generation)
+        generations = [fetched[ns] if generation is None else generation
+                       for ns, generation in zip(namespaces, generations)]
+    return generations
+
+def current_generations(namespaces):
+    """
+    Return the generations of the namespaces, or None if Redis can't be reached.
+    """
+    if not redis_available():
+        return None
+    
+    try:
+        return get_generations(namespaces)
+    except Exception as e:
+        logger.error(f"Error reading cache generations: {str(e)}")
+        return None
+
+def versioned_key(key_prefix, namespaces=None):
+    """
+    Build a cache key that embeds the generations of its namespaces.
+    Bumping any of those generations makes the key unreachable, and the
+    orphaned entry simply ages out through its TTL.
+    """
+    if not namespaces:
+        return key_prefix
+    generations = get_generations(namespaces)
+    return f"{key_prefix}:v{'.'.join(str(g) for g in generations)}"
+
+def bump_generation(*namespaces):
+    """
+    Invalidate every cache entry built under the given namespaces.
+    This is one O(1) INCR per namespace, sent in a single pipeline. The new
+    generations are published so other workers drop their local copies.
+    """
+    if not namespaces or not redis_available():
+        return False
+    
+    try:
+        initial = _initial_generation()
+        pipe = redis_client.pipeline(transaction=False)
+        for namespace in namespaces:
+            # A missing counter starts from the clock, not from 0
+            pipe.set(generation_key(namespace), initial, nx=True)
+            pipe.incr(generation_key(namespace))
+        generations = dict(zip(namespaces, pipe.execute()[1::2]))
+        
+        if local_cache is not None:
+            for namespace, generation in generations.items():
+                local_generations.set_max(namespace, generation)
+            local_cache.evict_namespaces(namespaces)
+            _publish_invalidation(generations=generations)
+        return True
+    except Exception as e:
+        logger.error(f"Error bumping cache generation: {str(e)}")
+        return False
+
+def set_cached(key_prefix, data, expire=300, namespaces=None):
+    """
+    Write a value straight into the cache entry that cache_data() would read
+    for the same key prefix and namespaces (write-through after a commit).
+    Other workers drop their local copy of the key.
+    """
+    if not redis_available():
+        return False
+    
+    try:
+        cache_key = versioned_key(key_prefix, namespaces)
+        _store_entry(cache_key, data, expire, 0, prefix=stats_prefix(key_prefix))
+        if local_cache is not None:
+            local_cache.set(cache_key, data, ttl=expire, namespaces=namespaces)
+            _publish_invalidation(keys=[cache_key])
+        return True
+    except Exception as e:
+        logger.error(f"Error writing through to cache: {str(e)}")
+        return False
+
+def record_stat(name, amount=1):
+    """
+    Increment a cache counter for this worker (and cluster-wide for stampede counters).
+    """
+    with _stats_lock:
+        cache_stats[name] += amount
+    
+    if name in SHARED_STATS and redis_available():
+        try:
+            redis_client.hincrby(STATS_KEY, name, amount)
+        except Exception:
+            pass
+
+def get_cache_stats():
+    """
+    Return the counters of this worker and the cluster-wide stampede counters.
+    """
+    with _stats_lock:
+        stats = {"worker": dict(cache_stats), "cluster": {}}
+    
+    if redis_client is not None:
+        try:
+            stats["cluster"] = {k.decode(): int(v) for k, v in redis_client.hgetall(STATS_KEY).items()}
+        except Exception as e:
+            logger.error(f"Error reading cache stats: {str(e)}")
+    return stats
+
+def stats_prefix(key_prefix):
+    """
+    Reduce a cache key prefix to its family, e.g. 'user_tasks_4_None_...' -> 'user_tasks'.
+    """
+    return re.match(r'(.*?)(?:_\d|$)', key_prefix).group(1) or key_prefix
+
+def get_payload_stats():
+    """
+    Return cluster-wide payload sizes per key prefix family.
+    serialized_bytes is the size before compression, stored_bytes what Redis holds.
+    """
+    stats = {}
+    if redis_client is None:
+        return stats
+    
+    try:
+        for field, value in redis_client.hgetall(PAYLOAD_STATS_KEY).items():
+            prefix, _, metric = field.decode().rpartition(':')
+            stats.setdefault(prefix, {})[metric] = int(value)
+    except Exception as e:
+        logger.error(f"Error reading cache payload stats: {str(e)}")
+    return stats
+
+def _load_entry(cache_key):
+    """
+    Read a cache envelope from Redis.
+    Returns (data, delta, expires_at) or None on a miss or unknown format.
+    """
+    cached_data = redis_client.get(cache_key)
+    if not cached_data:
+        return None
+    
+    entry = codec.decode(cached_data)
+    if not isinstance(entry, dict) or entry.keys() != {"v", "d", "e"}:
+        return None
+    return entry["v"], entry["d"], entry["e"]
+
+def _store_entry(cache_key, data, expire, delta, stale_ttl=0, prefix=None):
+    """
+    Write a cache envelope to Redis.
+    The envelope carries the logical expiry and the recomputation time so
+    that readers can refresh early; the physical TTL is extended by
+    stale_ttl so a stale copy can be served while another worker recomputes.
+    Payload sizes are accumulated per prefix family in the same round-trip.
+    """
+    envelope = {"v": data, "d": delta, "e": time.time() + expire}
+    payload, serialized_size = codec.encode(envelope)
+    
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.setex(cache_key, expire + stale_ttl, payload)
+    if prefix:
+        pipe.hincrby(PAYLOAD_STATS_KEY, f"{prefix}:writes", 1)
+        pipe.hincrby(PAYLOAD_STATS_KEY, f"{prefix}:serialized_bytes", serialized_size)
+        pipe.hincrby(PAYLOAD_STATS_KEY, f"{prefix}:stored_bytes", len(payload))
+    pipe.execute()
+
+def _should_refresh_early(delta, expires_at, beta):
+    """
+    Probabilistic early expiration (XFetch): the closer the key is to expiring
+    and the longer it takes to rebuild, the more likely a refresh becomes.
+    """
+    if beta <= 0:
+        return False
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
 
-def cache_data(key_prefix, expire=300):
+def _acquire_lock(lock_key, lock_timeout):
+    """
+    Try to take the single-flight lock for a cache key; return its token or None.
+    """
+    token = uuid.uuid4().hex
+    if redis_client.set(lock_key, token, nx=True, ex=lock_timeout):
+        return token
+    return None
+
+def _release_lock(lock_key, token):
+    """
+    Release a single-flight lock taken by _acquire_lock().
+    """
+    try:
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except Exception as e:
+        logger.error(f"Error releasing cache lock: {str(e)}")
+
+def cache_data(key_prefix, expire=300, namespaces=None, local=True,
+               lock=False, lock_timeout=10, lock_wait=2.0, stale_ttl=60, early_beta=0):
     """
     Decorator to cache function results in Redis.
+    When namespaces are given, the key is versioned with their generations
+    so that bump_generation() invalidates it. None results are not cached.
+    With local=True, hits are also kept in the per-worker tier if enabled.
+    
+    Stampede protection is opt-in per decorator:
+    - lock=True lets only one worker recompute a missing or expired key;
+      others serve the stale copy (kept stale_ttl seconds past expiry) or
+      wait up to lock_wait seconds for the fresh value.
+    - early_beta > 0 refreshes hot keys probabilistically before they expire
+      (1.0 is the usual setting, higher refreshes earlier).
     """
+    prefix = stats_prefix(key_prefix)
+    
     def decorator(f):
+        def compute(call, cache_key, use_local, early=False):
+            record_stat('early_recomputations' if early else 'recomputations')
+            started = time.monotonic()
+            data = call()
+            if data is None:
+                return data
+            
+            try:
+                # Store in cache
+                _store_entry(cache_key, data, expire, time.monotonic() - started,
+                             stale_ttl if lock else 0, prefix)
+                if use_local:
+                    local_cache.set(cache_key, data, ttl=expire, namespaces=namespaces)
+            except Exception as e:
+                logger.error(f"Error storing in cache: {str(e)}")
+            return data
+        
+        def single_flight(call, cache_key, use_local, stale, early):
+            lock_key = f"lock:{cache_key}"
+            try:
+                token = _acquire_lock(lock_key, lock_timeout)
+            except Exception as e:
+                logger.error(f"Error acquiring cache lock: {str(e)}")
+                return compute(call, cache_key, use_local, early)
+            
+            if token:
+                try:
+                    return compute(call, cache_key, use_local, early)
+                finally:
+                    _release_lock(lock_key, token)
+            
+            # Another worker is recomputing: serve what we have or wait for it
+            if stale is not None:
+                record_stat('coalesced_stale')
+                return stale
+            
+            deadline = time.monotonic() + lock_wait
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    entry = _load_entry(cache_key)
+                except Exception as e:
+                    logger.error(f"Error retrieving from cache: {str(e)}")
+                    break
+                if entry is not None:
+                    record_stat('coalesced_waits')
+                    return entry[0]
+            
+            record_stat('lock_timeouts')
+            return compute(call, cache_key, use_local)
+        
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if redis_client is None:
+            if not redis_available():
                 return f(*args, **kwargs)
                 
             # Create a unique key based on the function arguments
@@ -52,47 +577,67 @@ def cache_data(key_prefix, expire=300):
             # Add kwargs to key
             for k, v in sorted(kwargs.items()):
                 key_parts.append(f"{k}:{v}")
-                
-            cache_key = ":".join(key_parts)
             
+            call = partial(f, *args, **kwargs)
+            use_local = local and local_cache is not None
+            stale = None
+            early = False
+                
             try:
+                cache_key = versioned_key(":".join(key_parts), namespaces)
+                
+                # Try the in-process tier first
+                if use_local:
+                    data = local_cache.get(cache_key)
+                    if data is not None:
+                        record_stat('local_hits')
+                        return data
+                
                 # Try to get data from cache
-                cached_data = redis_client.get(cache_key)
-                if cached_data:
-                    return json.loads(cached_data)
+                entry = _load_entry(cache_key)
+                if entry is not None:
+                    data, delta, expires_at = entry
+                    if time.time() < expires_at:
+                        if not _should_refresh_early(delta, expires_at, early_beta):
+                            record_stat('hits')
+                            if use_local:
+                                local_cache.set(cache_key, data, ttl=expires_at - time.time(), namespaces=namespaces)
+                            return data
+                        early = True
+                    stale = data
+                if not early:
+                    record_stat('misses')
             except Exception as e:
                 logger.error(f"Error retrieving from cache: {str(e)}")
                 return f(*args, **kwargs)
-                
-            # If not in cache, call the original function
-            data = f(*args, **kwargs)
             
-            try:
-                # Store in cache
-                redis_client.setex(
-                    cache_key,
-                    expire,
-                    json.dumps(data)
-                )
-            except Exception as e:
-                logger.error(f"Error storing in cache: {str(e)}")
-                
-            return data
+            # If not in cache, call the original function
+            if lock:
+                return single_flight(call, cache_key, use_local, stale, early)
+            return compute(call, cache_key, use_local, early)
         return decorated_function
     return decorator
 
 def invalidate_cache(pattern):
     """
     Invalidate cache entries matching the pattern.
+    Prefer bump_generation() for routine writes; this walks the keyspace
+    incrementally with SCAN and is meant for maintenance purges only.
     """
     if redis_client is None:
         return 0
     
     try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            return redis_client.delete(*keys)
-        return 0
+        deleted = 0
+        batch = []
+        for key in redis_client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += redis_client.unlink(*batch)
+        return deleted
     except Exception as e:
         logger.error(f"Error invalidating cache: {str(e)}")
         return 0
@@ -104,6 +649,10 @@ def clear_all_cache():
     if redis_client is None:
         return False
     
+    if local_cache is not None:
+        local_cache.clear()
+        local_generations.clear()
+    
     try:
         redis_client.flushdb()
         return True
@@ -111,15 +660,26 @@ def clear_all_cache():
         logger.error(f"Error clearing cache: {str(e)}")
         return False
 
-def check_redis():
+def check_redis(force=False):
     """
     Check if Redis is available.
+    The PING result is reused for health_check_ttl seconds, and no PING is
+    sent at all while the circuit breaker is open.
     """
+    global _last_health_check
+    
     if redis_client is None:
         return False
+    if redis_client.breaker.state == CircuitBreaker.OPEN:
+        return False
+    
+    checked_at, healthy = _last_health_check
+    if not force and time.monotonic() - checked_at < health_check_ttl:
+        return healthy
     
     try:
-        redis_client.ping()
-        return True
+        healthy = bool(redis_client.ping())
     except Exception:
-        return False
\ No newline at end of file
+        healthy = False
+    _last_health_check = (time.monotonic(), healthy)
+    return healthy
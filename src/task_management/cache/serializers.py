@@ -0,0 +1,124 @@
+# src/task_management/cache/serializers.py
+"""
+Serializers for cached payloads in TaskFlow.
+This module provides a small serializer interface with a JSON implementation
+and a faster, more compact msgpack implementation, plus optional zlib/lz4
+compression applied above a size threshold. Encoded payloads carry a 2-byte
+header (serializer, compression) so entries written with different settings
+can always be read back.
+"""
+import json
+import logging
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+class JSONSerializer:
+    """
+    Standard library JSON serializer, always available.
+    """
+    name = 'json'
+    marker = b'j'
+
+    def dumps(self, data):
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, payload):
+        return json.loads(payload)
+
+class MsgpackSerializer:
+    """
+    Binary msgpack serializer, used when the msgpack package is installed.
+    """
+    name = 'msgpack'
+    marker = b'm'
+
+    def dumps(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+SERIALIZERS = {cls.marker: cls for cls in (JSONSerializer, MsgpackSerializer)}
+
+NO_COMPRESSION = b'-'
+ZLIB = b'z'
+LZ4 = b'l'
+
+def _compress(method, payload):
+    if method == LZ4:
+        return lz4_frame.compress(payload)
+    return zlib.compress(payload, 6)
+
+def _decompress(method, payload):
+    if method == LZ4:
+        return lz4_frame.decompress(payload)
+    if method == ZLIB:
+        return zlib.decompress(payload)
+    return payload
+
+class PayloadCodec:
+    """
+    Encode and decode cached payloads with a serializer and optional compression.
+    """
+
+    def __init__(self, serializer='json', compression=None, threshold=1024):
+        if serializer == 'msgpack' and msgpack is None:
+            logger.warning("CACHE_SERIALIZER is msgpack but the msgpack package is not installed "
+                           "(see requirements.txt) - falling back to JSON cache serialization")
+            serializer = 'json'
+        self.serializer = MsgpackSerializer() if serializer == 'msgpack' else JSONSerializer()
+
+        if compression == 'lz4' and lz4_frame is None:
+            logger.warning("CACHE_COMPRESSION is lz4 but the lz4 package is not installed "
+                           "(see requirements.txt) - falling back to zlib cache compression")
+            compression = 'zlib'
+        self.compression = {'lz4': LZ4, 'zlib': ZLIB}.get(compression, NO_COMPRESSION)
+        self.threshold = threshold
+
+    def encode(self, data):
+        """
+        Serialize data and compress it if it is larger than the threshold.
+        Returns (payload, serialized_size).
+        """
+        payload = self.serializer.dumps(data)
+        size = len(payload)
+        method = NO_COMPRESSION
+        if self.compression != NO_COMPRESSION and size >= self.threshold:
+            compressed = _compress(self.compression, payload)
+            if len(compressed) < size:
+                payload, method = compressed, self.compression
+        return self.serializer.marker + method + payload, size
+
+    def decode(self, payload):
+        """
+        Decode a payload written by any codec configuration.
+        """
+        # Entries written before headers were introduced are plain JSON
+        if payload[:1] in (b'{', b'['):
+            return json.loads(payload)
+
+        serializer = SERIALIZERS.get(payload[:1])
+        if serializer is None or (serializer is MsgpackSerializer and msgpack is None):
+            raise ValueError("Unknown cache payload format")
+        return serializer().loads(_decompress(payload[1:2], payload[2:]))
+
+def build_codec(config):
+    """
+    Create the payload codec described by the app configuration.
+    """
+    return PayloadCodec(
+        serializer=config.get('CACHE_SERIALIZER', 'json'),
+        compression=config.get('CACHE_COMPRESSION'),
+        threshold=config.get('CACHE_COMPRESSION_THRESHOLD', 1024)
+    )
@@ -3,6 +3,7 @@
 This module defines the Category model for organizing tasks.
 Categories allow users to group related tasks together.
 """
+from sqlalchemy import delete, func, update
 from src.task_management.db import db
 from datetime import datetime
 
@@ -30,10 +31,12 @@ class Category(db.Model):
         """
         return f"<Category {self.name} (ID: {self.id})>"
     
-    def to_dict(self):
+    def to_dict(self, task_counts=None):
         """
         Convert the Category object to a dictionary for API responses.
+        task_counts maps status -> number of tasks, as returned by with_task_counts().
         """
+        task_counts = dict(task_counts or {})
         return {
             'id': self.id,
             'name': self.name,
@@ -43,13 +46,84 @@ class Category(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'user_id': self.user_id,
-            'task_count': self.tasks.count() if hasattr(self, 'tasks') else 0
+            'task_count': sum(task_counts.values()),
+            'task_counts': task_counts
         }
     
+    @classmethod
+    def with_task_counts(cls, user_id, category_id=None):
+        """
+        Get a user's categories with their task counts per status in one query.
+        Returns a list of (category, counts) pairs, where counts maps status -> count.
+        """
+        from src.task_management.tasks.models import Task
+        
+        counts = db.session.query(
+            Task.category_id, Task.status, func.count(Task.id).label('task_count')
+        ).filter(Task.user_id == user_id, Task.category_id.isnot(None))
+        query = db.session.query(cls).filter(cls.user_id == user_id)
+        if category_id is not None:
+            counts = counts.filter(Task.category_id == category_id)
+            query = query.filter(cls.id == category_id)
+        counts = counts.group_by(Task.category_id, Task.status).subquery()
+        
+        query = query.outerjoin(counts, counts.c.category_id == cls.id).add_columns(
+            counts.c.status, counts.c.task_count
+        ).order_by(cls.id)
+        
+        results = {}
+        for category, status, task_count in query:
+            _, category_counts = results.setdefault(category.id, (category, {}))
+            if status is not None:
+                category_counts[status] = task_count
+        return list(results.values())
+    
+    @classmethod
+    def data_version(cls, user_id):
+        """
+        Get (category count, latest update time) for a user, used as an HTTP validator.
+        """
+        return db.session.query(func.count(cls.id), func.max(cls.updated_at)).filter(
+            cls.user_id == user_id
+        ).one()
+    
+    @classmethod
+    def merge_into(cls, source_ids, target_id, user_id):
+        """
+        Move a user's tasks, live and archived, from the source categories into
+        the target category and delete the sources, with one UPDATE per task
+        table and one DELETE however many tasks are involved, plus two
+        statements to move the task counters.
+        Returns the number of live tasks moved; the caller commits.
+        """
+        from src.task_management.tasks.models import Task
+        from src.task_management.tasks.archive import TaskArchive
+        from src.task_management.tasks.counters import merge_category_counters
+        
+        moved = db.session.execute(
+            update(Task)
+            .where(Task.user_id == user_id, Task.category_id.in_(source_ids))
+            .values(category_id=target_id, updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        db.session.execute(
+            update(TaskArchive)
+            .where(TaskArchive.user_id == user_id, TaskArchive.category_id.in_(source_ids))
+            .values(category_id=target_id),
+            execution_options={"synchronize_session": False}
+        )
+        db.session.execute(
+            delete(cls).where(cls.user_id == user_id, cls.id.in_(source_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        merge_category_counters(source_ids, target_id, user_id)
+        return moved
+    
     @classmethod
     def get_default_category(cls, user_id):
         """
         Get or create a default category for a user.
+        A new category is flushed, not committed, so it joins the caller's transaction.
         """
         default_category = cls.query.filter_by(
             user_id=user_id, 
@@ -64,6 +138,6 @@ class Category(db.Model):
                 user_id=user_id
             )
             db.session.add(default_category)
-            db.session.commit()
+            db.session.flush()
             
         return default_category
\ No newline at end of file
@@ -7,10 +7,12 @@ as well as assigning tasks to categories.
 from flask import request, jsonify, render_template, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from sqlalchemy.exc import SQLAlchemyError
-from src.task_management.db import db
+from src.task_management.db import db, query_budget
 from src.task_management.auth.routes import token_required
 from .models import Category
-from src.task_management.cache.redis_client import cache_data, invalidate_cache
+from src.task_management.tasks.models import Task
+from src.task_management.cache.redis_client import cache_data, bump_generation
+from src.task_management.cache.conditional import compute_validators, is_not_modified, not_modified, apply_validators
 from . import categories_bp
 
 # Web UI Routes
@@ -20,8 +22,12 @@ def list_categories():
     """
     Display all categories for the current user.
     """
-    categories = Category.query.filter_by(user_id=current_user.id).all()
-    return render_template('categories/list_categories.html', categories=categories)
+    categories_with_counts = Category.with_task_counts(current_user.id)
+    return render_template(
+        'categories/list_categories.html',
+        categories=[category for category, _ in categories_with_counts],
+        task_counts={category.id: counts for category, counts in categories_with_counts}
+    )
 
 @categories_bp.route('/new', methods=['GET', 'POST'])
 @login_required
@@ -50,7 +56,7 @@ def create_category():
         try:
             db.session.add(category)
             db.session.commit()
-            invalidate_cache(f'user_categories_{current_user.id}')
+            bump_generation(f'user_categories_{current_user.id}')
             flash('Category created successfully.', 'success')
             return redirect(url_for('categories.list_categories'))
         except SQLAlchemyError as e:
@@ -87,8 +93,7 @@ def edit_category(category_id):
         
         try:
             db.session.commit()
-            invalidate_cache(f'user_categories_{current_user.id}')
-            invalidate_cache(f'category_{category_id}')
+            bump_generation(f'user_categories_{current_user.id}', f'category_{category_id}')
             flash('Category updated successfully.', 'success')
             return redirect(url_for('categories.list_categories'))
         except SQLAlchemyError as e:
@@ -114,18 +119,16 @@ def delete_category(category_id):
     # Get default category for reassigning tasks
     default_category = Category.get_default_category(current_user.id)
     
+    user_id = current_user.id
+    default_id = default_category.id
+    
     try:
-        # Reassign tasks to default category
-        for task in category.category_tasks:
-            task.category_id = default_category.id
-        
-        # Delete the category
-        db.session.delete(category)
+        # Reassign tasks to the default category and delete this one, set-based
+        Category.merge_into([category_id], default_id, user_id)
         db.session.commit()
         
         # Invalidate caches
-        invalidate_cache(f'user_categories_{current_user.id}')
-        invalidate_cache(f'category_{category_id}')
+        bump_generation(f'user_categories_{user_id}', f'category_{category_id}', f'category_{default_id}')
         
         flash('Category deleted successfully.', 'success')
     except SQLAlchemyError as e:
@@ -136,20 +139,39 @@ def delete_category(category_id):
 
 # API Routes
 @categories_bp.route('/api/categories', methods=['GET'])
+@query_budget(4)
 @token_required
 def api_get_categories(current_user):
     """
     Get all categories for the authenticated user.
     """
+    # Answer revalidation requests without running the query
+    etag, last_modified = compute_validators(
+        current_user.id,
+        [f'user_categories_{current_user.id}', f'user_tasks_{current_user.id}'],
+        fallback=lambda: [Category.data_version(current_user.id), Task.data_version(current_user.id)]
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    
     # Try to get from cache first
-    @cache_data(f'user_categories_{current_user.id}', expire=300)
+    @cache_data(
+        f'user_categories_{current_user.id}',
+        expire=300,
+        namespaces=[f'user_categories_{current_user.id}', f'user_tasks_{current_user.id}'],
+        lock=True,
+        early_beta=1.0
+    )
     def get_user_categories():
-        categories = Category.query.filter_by(user_id=current_user.id).all()
-        return {"categories": [category.to_dict() for category in categories]}
+        # Task counts come from the same aggregate query, so they are always in sync
+        return {"categories": [
+            category.to_dict(counts) for category, counts in Category.with_task_counts(current_user.id)
+        ]}
     
-    return jsonify(get_user_categories()), 200
+    return apply_validators(jsonify(get_user_categories()), etag, last_modified), 200
 
 @categories_bp.route('/api/categories', methods=['POST'])
+@query_budget(3)
 @token_required
 def api_create_category(current_user):
     """
@@ -174,7 +196,7 @@ def api_create_category(current_user):
         db.session.commit()
         
         # Invalidate cache
-        invalidate_cache(f'user_categories_{current_user.id}')
+        bump_generation(f'user_categories_{category.user_id}')
         
         return jsonify({
             "message": "Category created successfully",
@@ -185,26 +207,42 @@ def api_create_category(current_user):
         return jsonify({"error": f"Failed to create category: {str(e)}"}), 500
 
 @categories_bp.route('/api/categories/<int:category_id>', methods=['GET'])
+@query_budget(4)
 @token_required
 def api_get_category(current_user, category_id):
     """
     Get a specific category by ID.
     """
+    # Answer revalidation requests without running the query
+    etag, last_modified = compute_validators(
+        current_user.id,
+        [f'category_{category_id}', f'user_tasks_{current_user.id}'],
+        fallback=lambda: [Category.data_version(current_user.id), Task.data_version(current_user.id)]
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    
     # Try to get from cache first
-    @cache_data(f'category_{category_id}', expire=300)
+    @cache_data(
+        f'category_{category_id}_user_{current_user.id}',
+        expire=300,
+        namespaces=[f'category_{category_id}', f'user_tasks_{current_user.id}']
+    )
     def get_category():
-        category = Category.query.filter_by(id=category_id, user_id=current_user.id).first()
-        if not category:
+        result = Category.with_task_counts(current_user.id, category_id)
+        if not result:
             return None
-        return {"category": category.to_dict()}
+        category, counts = result[0]
+        return {"category": category.to_dict(counts)}
     
     result = get_category()
     if not result:
         return jsonify({"error": "Category not found"}), 404
     
-    return jsonify(result), 200
+    return apply_validators(jsonify(result), etag, last_modified), 200
 
 @categories_bp.route('/api/categories/<int:category_id>', methods=['PUT'])
+@query_budget(4)
 @token_required
 def api_update_category(current_user, category_id):
     """
@@ -230,21 +268,25 @@ def api_update_category(current_user, category_id):
         category.icon = data['icon']
     
     try:
+        user_id = category.user_id
         db.session.commit()
         
         # Invalidate caches
-        invalidate_cache(f'user_categories_{current_user.id}')
-        invalidate_cache(f'category_{category_id}')
+        bump_generation(f'user_categories_{user_id}', f'category_{category_id}')
+        
+        # Reload the category together with its task counts
+        category, counts = Category.with_task_counts(user_id, category_id)[0]
         
         return jsonify({
             "message": "Category updated successfully",
-            "category": category.to_dict()
+            "category": category.to_dict(counts)
         }), 200
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to update category: {str(e)}"}), 500
 
 @categories_bp.route('/api/categories/<int:category_id>', methods=['DELETE'])
+@query_budget(9)
 @token_required
 def api_delete_category(current_user, category_id):
     """
@@ -261,20 +303,74 @@ def api_delete_category(current_user, category_id):
     # Get default category for reassigning tasks
     default_category = Category.get_default_category(current_user.id)
     
+    user_id = current_user.id
+    default_id = default_category.id
+    
     try:
-        # Reassign tasks to default category
-        for task in category.category_tasks:
-            task.category_id = default_category.id
+        # Reassign tasks to the default category and delete this one, set-based
+        moved = Category.merge_into([category_id], default_id, user_id)
+        db.session.commit()
+        
+        # Invalidate caches
+        bump_generation(f'user_categories_{user_id}', f'category_{category_id}', f'category_{default_id}')
         
-        # Delete the category
-        db.session.delete(category)
+        return jsonify({"message": "Category deleted successfully", "reassigned_tasks": moved}), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to delete category: {str(e)}"}), 500
+
+@categories_bp.route('/api/categories/<int:category_id>/merge', methods=['POST'])
+@query_budget(8)
+@token_required
+def api_merge_categories(current_user, category_id):
+    """
+    Merge other categories into this one.
+    Their tasks are moved here in one statement and the merged categories are deleted.
+    """
+    data = request.get_json(silent=True) or {}
+    source_ids = data.get('source_ids')
+    if (not isinstance(source_ids, list) or not source_ids
+            or not all(isinstance(source_id, int) and not isinstance(source_id, bool) for source_id in source_ids)):
+        return jsonify({"error": "source_ids must be a non-empty list of category IDs"}), 400
+    
+    source_ids = set(source_ids)
+    if category_id in source_ids:
+        return jsonify({"error": "A category cannot be merged into itself"}), 400
+    
+    user_id = current_user.id
+    categories = Category.query.filter(
+        Category.user_id == user_id, Category.id.in_(source_ids | {category_id})
+    ).all()
+    found = {category.id: category for category in categories}
+    if category_id not in found:
+        return jsonify({"error": "Category not found"}), 404
+    missing = source_ids - set(found)
+    if missing:
+        return jsonify({"error": "Categories not found", "missing_ids": sorted(missing)}), 404
+    
+    # Don't allow merging away the default category
+    if any(found[source_id].name == 'Uncategorized' for source_id in source_ids):
+        return jsonify({"error": "Cannot merge the default category into another category"}), 400
+    
+    try:
+        moved = Category.merge_into(list(source_ids), category_id, user_id)
         db.session.commit()
         
         # Invalidate caches
-        invalidate_cache(f'user_categories_{current_user.id}')
-        invalidate_cache(f'category_{category_id}')
+        bump_generation(
+            f'user_categories_{user_id}', f'category_{category_id}',
+            *(f'category_{source_id}' for source_id in sorted(source_ids))
+        )
         
-        return jsonify({"message": "Category deleted successfully"}), 200
+        # Reload the merged category together with its task counts
+        category, counts = Category.with_task_counts(user_id, category_id)[0]
+        
+        return jsonify({
+            "message": "Categories merged successfully",
+            "merged_ids": sorted(source_ids),
+            "reassigned_tasks": moved,
+            "category": category.to_dict(counts)
+        }), 200
     except SQLAlchemyError as e:
         db.session.rollback()
-        return jsonify({"error": f"Failed to delete category: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to merge categories: {str(e)}"}), 500
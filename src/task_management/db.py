@@ -1,23 +1,35 @@
 # src/task_management/db.py
 """
 Database configuration module for TaskFlow.
-This module initializes SQLAlchemy, Migrate, and Redis for caching.
+This module initializes SQLAlchemy and Migrate.
 It also provides helper functions for database operations and indexing.
+Redis is owned by the cache package, which shares one connection pool.
 """
+import click
+from flask import current_app, g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-import redis
-import os
+from alembic import command as alembic_command
+from alembic.script import ScriptDirectory
+from collections import Counter
+from functools import wraps
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 import logging
+import os
+import re
+import time
+from src.task_management.cache import redis_client as redis_cache
+from src.task_management import replicas, slow_queries
 
 
-
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy; the session sends safe requests' reads to replicas
+db = SQLAlchemy(session_options={'class_': replicas.RoutingSession})
 migrate = None  # Declaring migration
 
-# Initialize Redis client
-redis_client = None
+# The Alembic environment at the repository root, whatever the working directory
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'migrations')
 
 logger = logging.getLogger(__name__)
 
@@ -25,24 +37,18 @@ def init_app(app):
     """
     Initialize database and migration with the Flask app.
     """
-    global migrate, redis_client
+    global migrate
     
-    # Initialize SQLAlchemy
+    # Initialize SQLAlchemy, with a bind per read replica
+    replica_keys = replicas.configure_binds(app)
     db.init_app(app)
+    replicas.init_app(app, db, replica_keys)
     
     # Initialize Flask-Migrate
-    migrate = Migrate(app, db)
+    migrate = Migrate(app, db, directory=app.config.get('MIGRATIONS_DIRECTORY') or MIGRATIONS_DIRECTORY)
     
-    # Initialize Redis client for caching if configured
-    redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
-    try:
-        redis_client = redis.from_url(redis_url)
-        # Test the connection
-        redis_client.ping()
-        logger.info("Redis connection established successfully")
-    except redis.ConnectionError:
-        logger.warning("Redis connection failed - caching will be disabled")
-        redis_client = None
+    # Per-request SQL counts, timings and N+1 detection
+    register_instrumentation(app)
     
     # Register database commands with the CLI
     register_commands(app)
@@ -53,8 +59,10 @@ def register_commands(app):
     """
     @app.cli.command("create-db")
     def create_db():
-        """Create database tables from SQLAlchemy models."""
+        """Create database tables from SQLAlchemy models (prefer `flask db upgrade`)."""
         db.create_all()
+        # The models describe the latest schema, so record it as fully migrated
+        alembic_command.stamp(_alembic_config(), 'head')
         print("Database tables created.")
     
     @app.cli.command("drop-db")
@@ -92,6 +100,287 @@ def register_commands(app):
             print("Database seeded with initial data.")
         else:
             print("Admin user already exists, skipping seeding.")
+    
+    @app.cli.command("check-query-plans")
+    def check_query_plans():
+        """EXPLAIN the task list queries and check that each uses its index."""
+        from src.task_management.tasks.query_plans import check_task_indexes
+        
+        failures = 0
+        for description, index_name, plan, uses_index in check_task_indexes():
+            print(f"[{'ok' if uses_index else 'FAIL'}] {description}: expected {index_name}")
+            if not uses_index:
+                failures += 1
+                print("    " + plan.replace("\n", "\n    "))
+        
+        if failures:
+            raise SystemExit(f"{failures} query shape(s) do not use their index")
+        print("All task list queries use their indexes.")
+
+    @app.cli.command("benchmark-task-list")
+    @click.option('--user-id', type=int, default=None, help="List this user's tasks instead of synthetic ones.")
+    @click.option('--rows', type=int, default=1000, help="Rows per listing.")
+    @click.option('--repeat', type=int, default=5, help="Timed runs per path; the best is reported.")
+    def benchmark_task_list(user_id, rows, repeat):
+        """Compare rows/sec of the ORM and Core task list serialization paths."""
+        from src.task_management.tasks.benchmark import benchmark_task_list as run_benchmark
+        
+        result = run_benchmark(user_id, rows, repeat)
+        print(f"{result['rows']} rows, best of {result['repeat']}:")
+        print(f"  ORM  (Task + to_dict): {result['orm_rows_per_sec']:>12,.0f} rows/sec")
+        print(f"  Core (listing rows):   {result['core_rows_per_sec']:>12,.0f} rows/sec")
+        if result['speedup']:
+            print(f"  Core is {result['speedup']:.1f}x the ORM path")
+        if not result['identical']:
+            raise SystemExit("The two paths produced different output")
+        print("Outputs are identical.")
+
+    @app.cli.command("rebuild-task-stats")
+    @click.option('--user-id', type=int, default=None, help="Only rebuild this user's counters.")
+    def rebuild_task_stats(user_id):
+        """Recompute the per-user task counters from the tasks table."""
+        from src.task_management.tasks.counters import rebuild_counters
+        
+        rows = rebuild_counters(user_id)
+        db.session.commit()
+        print(f"Rebuilt {rows} task counter rows" + (f" for user {user_id}." if user_id else "."))
+
+    @app.cli.command("archive-tasks")
+    @click.option('--older-than-days', type=int, default=None,
+                  help="Archive tasks completed longer ago than this (default TASK_ARCHIVE_AFTER_DAYS).")
+    @click.option('--batch-size', type=int, default=None,
+                  help="Tasks moved per transaction (default TASK_ARCHIVE_BATCH_SIZE).")
+    @click.option('--max-batches', type=int, default=None, help="Stop after this many batches.")
+    def archive_tasks(older_than_days, batch_size, max_batches):
+        """Move old completed tasks to tasks_archive, one batch per transaction."""
+        from src.task_management.tasks.archive import archive_completed_tasks
+        
+        if older_than_days is None:
+            older_than_days = app.config.get('TASK_ARCHIVE_AFTER_DAYS', 90)
+        total = 0
+        for archived, user_ids in archive_completed_tasks(
+            older_than_days, batch_size or app.config.get('TASK_ARCHIVE_BATCH_SIZE', 1000), max_batches
+        ):
+            # Committed batches are visible at once, so cached lists must go too
+            redis_cache.bump_generation(*(f'user_tasks_{user_id}' for user_id in user_ids))
+            total += archived
+            print(f"Archived {archived} task(s); {total} so far.")
+        print(f"Archived {total} completed task(s) older than {older_than_days} days.")
+
+    @app.cli.command("sweep-overdue")
+    def sweep_overdue_tasks():
+        """Record tasks that became overdue since the last sweep (run on a schedule)."""
+        from src.task_management.tasks.overdue import sweep_overdue
+        
+        recorded = sweep_overdue()
+        db.session.commit()
+        print(f"Recorded {recorded} newly overdue task(s).")
+
+    @app.cli.command("sync-replicas")
+    def sync_replicas():
+        """Copy a SQLite primary into its SQLite replicas (local testing only)."""
+        import sqlite3
+
+        if db.engine.dialect.name != 'sqlite':
+            raise SystemExit("Only SQLite replicas can be synced; use streaming replication for Postgres")
+        if 'replicas' not in app.extensions:
+            raise SystemExit("No replicas configured; set DATABASE_REPLICA_URIS")
+
+        source = sqlite3.connect(db.engine.url.database)
+        try:
+            for key in app.extensions['replicas'].bind_keys:
+                url = db.engines[key].url
+                if url.get_backend_name() != 'sqlite':
+                    print(f"Skipping {key}: not a SQLite database")
+                    continue
+                target = sqlite3.connect(url.database)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                # Drop pooled connections that still see the old file contents
+                db.engines[key].dispose()
+                print(f"Synced {key} from the primary.")
+        finally:
+            source.close()
+
+def _alembic_config():
+    """
+    Alembic configuration for the app's migrations. Logging is left as the
+    app configured it, since migrations may run inside a running app.
+    """
+    config = current_app.extensions['migrate'].migrate.get_config()
+    config.attributes['configure_logger'] = False
+    return config
+
+def schema_revisions():
+    """
+    Return (database revision, head revisions): the revision recorded in
+    alembic_version, None if it has none, and the heads of the migration
+    scripts on disk. One SELECT; the heads are read from the filesystem.
+    """
+    heads = set(ScriptDirectory.from_config(_alembic_config()).get_heads())
+    try:
+        with db.engine.connect() as connection:
+            current = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        # No alembic_version table: an empty database, or one made before migrations
+        current = None
+    return current, heads
+
+def upgrade_schema():
+    """
+    Apply any pending migrations.
+    """
+    alembic_command.upgrade(_alembic_config(), 'head')
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when an endpoint runs more SQL statements than its budget allows
+    and SQL_QUERY_BUDGET_STRICT is enabled (the default under testing).
+    """
+
+class NPlusOneDetected(AssertionError):
+    """
+    Raised when one request runs the same statement shape more than
+    SQL_N_PLUS_ONE_THRESHOLD times and SQL_N_PLUS_ONE_STRICT is enabled
+    (the default under testing).
+    """
+
+# Bound parameter markers (qmark, pyformat, numeric) and expanded IN lists
+_PARAMETER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement):
+    """
+    Fingerprint a SQL statement so that executions differing only in their
+    parameters, including the length of IN lists, share one shape.
+    """
+    shape = _PARAMETER.sub('?', statement)
+    shape = _PARAMETER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+class RequestQueryStats:
+    """
+    SQL statements run while handling one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()
+
+    def repeated(self):
+        """
+        Return [(shape, count)] for shapes that ran more than once, most frequent first.
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > 1]
+
+def request_query_stats():
+    """
+    Return the current request's query stats, creating them on first use.
+    """
+    if 'sql_stats' not in g:
+        g.sql_stats = RequestQueryStats()
+    return g.sql_stats
+
+def _is_probe(context):
+    """
+    Internal probes (lag checks, EXPLAINs) opt out of counting, timing and
+    slow query logging with the skip_query_count execution option.
+    """
+    return context is not None and context.execution_options.get('skip_query_count', False)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """
+    Count SQL statements issued while handling the current request.
+    """
+    if _is_probe(context):
+        return
+    if has_request_context():
+        request_query_stats().count += 1
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def time_query(conn, cursor, statement, parameters, context, executemany):
+    """
+    Record the statement's duration and shape, pass it to the slow query
+    log, and flag N+1 query patterns.
+    """
+    started = getattr(context, 'query_started', None)
+    if started is None:
+        return
+
+    elapsed = time.perf_counter() - started
+    slow_queries.observe(conn, statement, parameters, executemany, elapsed)
+    if not has_request_context():
+        return
+
+    stats = request_query_stats()
+    stats.duration += elapsed
+    shape = statement_shape(statement)
+    stats.shapes[shape] += 1
+
+    # Report each shape once, when it first goes over the threshold
+    threshold = current_app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    if stats.shapes[shape] == threshold + 1:
+        message = f"Possible N+1 in {request.endpoint}: statement ran more than {threshold} times: {shape[:300]}"
+        if current_app.config.get('SQL_N_PLUS_ONE_STRICT', False):
+            raise NPlusOneDetected(message)
+        logger.warning(message)
+
+def register_instrumentation(app):
+    """
+    Report each request's SQL cost in a Server-Timing header and a debug log line.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('sql_stats')
+        started = g.get('request_started')
+        if stats is None or started is None:
+            return response
+
+        if app.config.get('SERVER_TIMING_ENABLED', True):
+            total_ms = (time.perf_counter() - started) * 1000
+            response.headers.add('Server-Timing', f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"')
+            response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+
+        if logger.isEnabledFor(logging.DEBUG):
+            repeated = '; '.join(f"{count}x {shape[:120]}" for shape, count in stats.repeated()[:3])
+            logger.debug(
+                f"{request.method} {request.path}: {stats.count} queries in {stats.duration * 1000:.1f} ms"
+                + (f", repeated: {repeated}" if repeated else "")
+            )
+        return response
+
+def query_budget(max_queries):
+    """
+    Decorator to cap the number of SQL statements a view may run.
+    Place it above token_required so the user lookup is counted too.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            stats = request_query_stats()
+            start = stats.count
+            response = f(*args, **kwargs)
+            used = stats.count - start
+            
+            if used > max_queries:
+                message = f"{request.endpoint} ran {used} SQL statements (budget {max_queries})"
+                if current_app.config.get('SQL_QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        return decorated_function
+    return decorator
 
 def optimize_query(query, model, page=1, per_page=20, **filters):
     """
@@ -121,23 +410,14 @@ def check_redis():
     """
     Check if Redis is available.
     """
-    if redis_client is None:
-        return False
-    
-    try:
-        redis_client.ping()
-        return True
-    except redis.ConnectionError:
-        return False
+    return redis_cache.check_redis()
 
 def clear_cache(pattern='*'):
     """
     Clear cache entries matching the pattern.
+    Uses SCAN instead of KEYS so Redis is never blocked for the whole keyspace.
     """
     if not check_redis():
         return 0
     
-    keys = redis_client.keys(pattern)
-    if keys:
-        return redis_client.delete(*keys)
-    return 0
\ No newline at end of file
+    return redis_cache.invalidate_cache(pattern)
@@ -0,0 +1,261 @@
+# src/task_management/replicas.py
+"""
+Read-replica routing for TaskFlow.
+Each URI in SQLALCHEMY_REPLICA_URIS becomes a SQLAlchemy bind. SELECTs issued
+while handling a GET, HEAD or OPTIONS request are sent to a healthy replica;
+everything else, and every statement after the request has written, goes to
+the primary, as do views marked @primary_only (writes reachable by GET). A
+user who wrote within the last REPLICA_STICKY_SECONDS (at least
+REPLICA_MAX_LAG) reads from the primary too, so they always see their own
+changes. Replicas that fail or lag by more than REPLICA_MAX_LAG seconds are
+skipped until they recover.
+"""
+import logging
+import random
+import threading
+import time
+import jwt
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from src.task_management.cache import redis_client as redis_cache
+from src.task_management.cache.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+BIND_PREFIX = 'replica_'
+STICKY_KEY = 'db:primary_until:{}'
+
+# Seconds a Postgres standby is behind its primary; 0 when it has replayed everything
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+class ReplicaSet:
+    """
+    Health, lag and stickiness state for the configured replicas of one app.
+    """
+
+    def __init__(self, bind_keys, sticky_seconds=10, max_lag=10, lag_check_interval=5,
+                 failure_threshold=3, cooldown=30):
+        self.bind_keys = list(bind_keys)
+        # A replica may be up to max_lag behind, so a shorter pin would let a
+        # writer read from one that has not replayed their write yet
+        self.sticky_seconds = max(sticky_seconds, max_lag)
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.breakers = {key: CircuitBreaker(failure_threshold, cooldown) for key in self.bind_keys}
+        self._lag = {}
+        self._sticky = {}
+        self._lock = threading.Lock()
+
+    def lag(self, key, engine):
+        """
+        Return the replica's lag in seconds, re-measured at most every
+        lag_check_interval seconds, or None if it could not be measured.
+        """
+        if engine.dialect.name != 'postgresql':
+            return 0
+
+        checked_at, lag = self._lag.get(key, (0.0, None))
+        if time.monotonic() - checked_at < self.lag_check_interval:
+            return lag
+
+        try:
+            with engine.connect().execution_options(skip_query_count=True) as conn:
+                lag = float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+            self.breakers[key].record_success()
+        except DBAPIError as e:
+            logger.warning(f"Lag check failed for {key}: {str(e)}")
+            lag = None
+        self._lag[key] = (time.monotonic(), lag)
+        return lag
+
+    def choose(self, engines):
+        """
+        Return the bind key of a random usable replica, or None.
+        """
+        usable = []
+        for key in self.bind_keys:
+            if self.breakers[key].state == CircuitBreaker.OPEN:
+                continue
+            lag = self.lag(key, engines[key])
+            if lag is not None and lag <= self.max_lag:
+                usable.append(key)
+        return random.choice(usable) if usable else None
+
+    def mark_write(self, identity):
+        """
+        Pin identity's reads to the primary for sticky_seconds.
+        The pin is shared through Redis when it is available and always
+        kept in this worker as well.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sticky) > 1024:
+                self._sticky = {k: until for k, until in self._sticky.items() if until > now}
+            self._sticky[identity] = now + self.sticky_seconds
+
+        if redis_cache.redis_available():
+            try:
+                redis_cache.redis_client.set(STICKY_KEY.format(identity), 1, px=int(self.sticky_seconds * 1000))
+            except Exception as e:
+                logger.error(f"Error recording primary stickiness: {str(e)}")
+
+    def is_sticky(self, identity):
+        """
+        Return True if identity wrote recently and must read from the primary.
+        """
+        if self._sticky.get(identity, 0) > time.monotonic():
+            return True
+        if redis_cache.redis_available():
+            try:
+                return bool(redis_cache.redis_client.exists(STICKY_KEY.format(identity)))
+            except Exception as e:
+                logger.error(f"Error checking primary stickiness: {str(e)}")
+        return False
+
+def request_identity():
+    """
+    Identify the requesting user without touching the database.
+    The bearer token is only decoded to pick a routing key; token_required
+    still verifies it before the view runs.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        try:
+            claims = jwt.decode(auth_header[7:], options={"verify_signature": False})
+            return f"api:{claims['sub']}"
+        except (jwt.InvalidTokenError, KeyError):
+            return None
+    user_id = flask_session.get('_user_id')
+    return f"web:{user_id}" if user_id else None
+
+def primary_only(f):
+    """
+    Mark a view that writes even when called with GET, so its reads come
+    from the primary and see the state the write replaces.
+    """
+    f.reads_primary = True
+    return f
+
+def _choose_route(replicas, engines):
+    if request.method not in SAFE_METHODS:
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'reads_primary', False):
+        return None
+    identity = request_identity()
+    if identity is not None and replicas.is_sticky(identity):
+        return None
+    return replicas.choose(engines)
+
+class RoutingSession(Session):
+    """
+    Session that sends a safe request's reads to a replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            replica = self._replica_bind(clause)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_bind(self, clause):
+        if not has_request_context() or g.get('db_wrote'):
+            return None
+        if not getattr(clause, 'is_select', False) or getattr(clause, '_for_update_arg', None) is not None:
+            return None
+        replicas = current_app.extensions.get('replicas')
+        if replicas is None:
+            return None
+
+        # The route is chosen once per request so all of its reads see one database
+        key = g.get('db_replica', False)
+        if key is False:
+            key = g.db_replica = _choose_route(replicas, self._db.engines)
+            if key is not None:
+                key = g.db_replica = self._checkout(replicas, key)
+        return self._db.engines[key] if key is not None else None
+
+    def _checkout(self, replicas, key):
+        """
+        Join the replica to this session's transaction, falling back to the
+        primary if it cannot be reached.
+        """
+        try:
+            self.connection(bind_arguments={'bind': self._db.engines[key]})
+        except DBAPIError as e:
+            # The engine's handle_error hook has already counted the failure
+            logger.warning(f"Replica {key} unavailable, reading from the primary: {str(e)}")
+            return None
+        replicas.breakers[key].record_success()
+        return key
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flagged_flush(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _flagged_dml(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    state = orm_execute_state
+    if has_request_context() and (state.is_insert or state.is_update or state.is_delete):
+        g.db_wrote = True
+
+def configure_binds(app):
+    """
+    Add a bind per configured replica to SQLALCHEMY_BINDS.
+    Must run before db.init_app(). Returns the replica bind keys.
+    """
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    keys = []
+    for index, uri in enumerate(uris):
+        key = f'{BIND_PREFIX}{index}'
+        # Pre-ping so a replica that went away is noticed at checkout, before any query
+        binds[key] = {'url': uri, 'pool_pre_ping': True}
+        keys.append(key)
+    app.config['SQLALCHEMY_BINDS'] = binds
+    return keys
+
+def init_app(app, db, bind_keys):
+    """
+    Enable replica routing for the app if any replicas are configured.
+    """
+    if not bind_keys:
+        return
+
+    replicas = ReplicaSet(
+        bind_keys,
+        sticky_seconds=app.config.get('REPLICA_STICKY_SECONDS', 10),
+        max_lag=app.config.get('REPLICA_MAX_LAG', 10),
+        lag_check_interval=app.config.get('REPLICA_LAG_CHECK_INTERVAL', 5),
+        failure_threshold=app.config.get('REPLICA_BREAKER_FAILURE_THRESHOLD', 3),
+        cooldown=app.config.get('REPLICA_BREAKER_COOLDOWN', 30)
+    )
+    app.extensions['replicas'] = replicas
+
+    with app.app_context():
+        for key in bind_keys:
+            engine = db.engines[key]
+
+            @event.listens_for(engine, 'handle_error')
+            def replica_error(context, key=key):
+                if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+                    replicas.breakers[key].record_failure()
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if g.get('db_wrote'):
+            identity = request_identity()
+            if identity is not None:
+                replicas.mark_write(identity)
+        return response
+
+    logger.info(f"Routing reads to {len(bind_keys)} replica(s)")
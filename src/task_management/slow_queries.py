@@ -0,0 +1,236 @@
+# src/task_management/slow_queries.py
+"""
+Slow query log for TaskFlow.
+Statements slower than SLOW_QUERY_THRESHOLD_MS are recorded with their bound
+parameters, the route that issued them and a query plan. Plans are captured
+off the request path: the statement is queued and a background thread runs
+EXPLAIN (ANALYZE off) on Postgres or EXPLAIN QUERY PLAN on SQLite over its
+own one-connection engine, so nothing is executed twice and a slow request
+never waits for, or takes a second pooled connection for, its plan. Entries
+are kept in a per-worker ring buffer for the admin API (their plan filled in
+once taken) and appended to a rotating JSONL file with the plan.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import has_request_context, request
+from sqlalchemy import create_engine
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'with')
+MAX_PARAMETER_LENGTH = 200
+# Pools that hand every caller the same connection (in-memory SQLite); explaining
+# on them would run inside, and could end, the request's own transaction
+SHARED_CONNECTION_POOLS = (StaticPool, SingletonThreadPool)
+PLAN_QUEUE_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+# Initialized by init_slow_query_log(); None disables the log
+slow_query_log = None
+
+class SlowQueryLog:
+    """
+    Threshold, sinks and plan cache for slow statements.
+    """
+
+    def __init__(self, threshold_ms=200, buffer_size=200, explain=True, explain_ttl=60, file_logger=None):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explain_ttl = explain_ttl
+        self.entries = deque(maxlen=buffer_size)
+        self.file_logger = file_logger
+        # Plans are cached per statement so a hot slow query is explained once per explain_ttl
+        self._plans = {}
+        self._lock = threading.Lock()
+        # Per-worker plan queue, thread and engines, created on first use after a fork
+        self._queue = None
+        self._worker_pid = None
+        self._engines = {}
+
+    def observe(self, conn, statement, parameters, executemany, elapsed):
+        """
+        Record the statement if it took longer than the threshold. Its plan
+        is taken in the background unless a recent one is cached.
+        """
+        if elapsed < self.threshold:
+            return
+
+        if executemany and parameters:
+            parameters = parameters[0]
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "duration_ms": round(elapsed * 1000, 1),
+            "statement": statement,
+            "parameters": _loggable(parameters),
+            "executemany": executemany,
+            "route": None,
+            "method": None,
+            "path": None,
+            "plan": None
+        }
+        if has_request_context():
+            entry.update(route=request.endpoint, method=request.method, path=request.path)
+        self.entries.append(entry)
+
+        if self.explain and self._explainable(conn.engine, statement):
+            entry["plan"] = self._cached_plan(statement)
+            if entry["plan"] is None and self._enqueue(entry, conn.engine, statement, parameters):
+                return  # written to the file once the plan is in
+        self._write(entry)
+
+    def _explainable(self, engine, statement):
+        return (statement.lstrip().lower().startswith(EXPLAINABLE)
+                and engine.dialect.name in ('postgresql', 'sqlite')
+                and not isinstance(engine.pool, SHARED_CONNECTION_POOLS))
+
+    def _cached_plan(self, statement):
+        cached = self._plans.get(statement)
+        if cached is not None and time.monotonic() - cached[0] < self.explain_ttl:
+            return cached[1]
+        return None
+
+    def _enqueue(self, entry, engine, statement, parameters):
+        """
+        Queue the entry for the plan thread. Returns False when the queue is
+        full, in which case the entry is logged without a plan.
+        """
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                # Threads, queues and connections do not survive a fork
+                self._queue = queue.Queue(maxsize=PLAN_QUEUE_SIZE)
+                self._engines = {}
+                self._worker_pid = os.getpid()
+                threading.Thread(target=self._plan_worker, args=(self._queue,),
+                                 name='slow-query-explain', daemon=True).start()
+        try:
+            self._queue.put_nowait((entry, engine.url, statement, parameters))
+            return True
+        except queue.Full:
+            return False
+
+    def _plan_worker(self, plans):
+        while True:
+            entry, url, statement, parameters = plans.get()
+            try:
+                entry["plan"] = self._cached_plan(statement) or self.plan(url, statement, parameters)
+                self._write(entry)
+            except Exception as e:
+                logger.error(f"Error recording slow query plan: {str(e)}")
+            finally:
+                plans.task_done()
+
+    def wait_for_plans(self):
+        """
+        Block until every queued plan has been taken.
+        """
+        if self._queue is not None and self._worker_pid == os.getpid():
+            self._queue.join()
+
+    def _write(self, entry):
+        if self.file_logger is not None:
+            self.file_logger.info(json.dumps(entry, default=str))
+
+    def _plan_engine(self, url):
+        # One connection per database is plenty for the occasional EXPLAIN
+        engine = self._engines.get(url)
+        if engine is None:
+            engine = self._engines[url] = create_engine(url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+        return engine
+
+    def plan(self, url, statement, parameters):
+        """
+        Return the statement's plan as a list of lines, taken over a dedicated
+        connection to the database at url.
+        """
+        engine = self._plan_engine(url)
+        if engine.dialect.name == 'postgresql':
+            explain = 'EXPLAIN (ANALYZE off) ' + statement
+        else:
+            explain = 'EXPLAIN QUERY PLAN ' + statement
+
+        try:
+            # The option stops the EXPLAIN being counted, timed or logged in turn
+            with engine.connect().execution_options(skip_query_count=True) as conn:
+                rows = conn.exec_driver_sql(explain, parameters or ()).fetchall()
+            plan = [' '.join(str(value) for value in row) if len(row) > 1 else str(row[0]) for row in rows]
+        except Exception as e:
+            plan = [f"EXPLAIN failed: {str(e)}"]
+
+        with self._lock:
+            if len(self._plans) > 500:
+                self._plans.clear()
+            self._plans[statement] = (time.monotonic(), plan)
+        return plan
+
+    def recent(self, limit=50):
+        """
+        Return up to limit entries, newest first.
+        """
+        return list(self.entries)[::-1][:limit]
+
+def _loggable(parameters):
+    """
+    Make bound parameters JSON-friendly and cap the length of long values.
+    """
+    def clean(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"<{len(value)} bytes>"
+        if isinstance(value, str) and len(value) > MAX_PARAMETER_LENGTH:
+            return value[:MAX_PARAMETER_LENGTH] + '…'
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    if isinstance(parameters, dict):
+        return {key: clean(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [clean(value) for value in parameters]
+    return clean(parameters)
+
+def init_slow_query_log(app, log_file=None):
+    """
+    Enable the slow query log from the app configuration.
+    log_file is used unless SLOW_QUERY_LOG_FILE overrides it.
+    """
+    global slow_query_log
+
+    if not app.config.get('SLOW_QUERY_LOG_ENABLED', True):
+        slow_query_log = None
+        return
+
+    file_logger = None
+    log_file = app.config.get('SLOW_QUERY_LOG_FILE') or log_file
+    if log_file:
+        file_logger = logging.getLogger('taskflow.slow_queries')
+        file_logger.handlers.clear()
+        file_logger.propagate = False
+        file_logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(
+            log_file,
+            maxBytes=app.config.get('SLOW_QUERY_LOG_MAX_BYTES', 10000000),
+            backupCount=app.config.get('SLOW_QUERY_LOG_BACKUP_COUNT', 5),
+            delay=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        file_logger.addHandler(handler)
+
+    slow_query_log = SlowQueryLog(
+        threshold_ms=app.config.get('SLOW_QUERY_THRESHOLD_MS', 200),
+        buffer_size=app.config.get('SLOW_QUERY_BUFFER_SIZE', 200),
+        explain=app.config.get('SLOW_QUERY_EXPLAIN', True),
+        file_logger=file_logger
+    )
+
+def observe(conn, statement, parameters, executemany, elapsed):
+    """
+    Pass a finished statement to the slow query log, if enabled.
+    """
+    if slow_query_log is not None:
+        slow_query_log.observe(conn, statement, parameters, executemany, elapsed)
@@ -0,0 +1,158 @@
+# src/task_management/tasks/archive.py
+"""
+Archive tier for completed tasks in TaskFlow.
+`flask archive-tasks` moves tasks that were completed (last updated) more
+than TASK_ARCHIVE_AFTER_DAYS ago from tasks to tasks_archive in batches, one
+transaction per batch, so the hot table and its indexes only grow with
+active work. A batch is all-or-nothing and the job restarts from whatever is
+left, so it can be interrupted and re-run at any time.
+Archived tasks keep their ids and are still counted in user_task_stats; the
+task list includes them when include_archived=true is passed.
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, literal, select, union_all
+from src.task_management.db import db
+from src.task_management.categories.models import Category
+from .models import Task
+from .listing import row_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Columns copied from tasks to tasks_archive
+TASK_COLUMNS = ('id', 'title', 'description', 'due_date', 'priority', 'priority_rank', 'status',
+                'user_id', 'category_id', 'created_at', 'updated_at')
+
+class TaskArchive(db.Model):
+    """
+    A completed task moved out of the tasks table.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # the task's original id
+    title = db.Column(db.String(140), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    due_date = db.Column(db.DateTime, nullable=False)
+    priority = db.Column(db.String(20), nullable=False)
+    priority_rank = db.Column(db.SmallInteger, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True, index=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Archived tasks are only read a user at a time, in list order
+    __table_args__ = (
+        db.Index('idx_task_archive_user_due', user_id, due_date, id),
+    )
+
+    def __repr__(self):
+        return f"<TaskArchive {self.id}: {self.title}>"
+
+    @staticmethod
+    def filtered_query(user_id, status=None, priority=None, category_id=None):
+        """
+        Get a user's archived tasks with the task list filters applied.
+        """
+        query = TaskArchive.query.filter_by(user_id=user_id)
+        if status:
+            query = query.filter_by(status=status)
+        if priority:
+            query = query.filter_by(priority=priority)
+        if category_id:
+            query = query.filter_by(category_id=category_id)
+        return query
+
+def listing_query(user_id, status=None, priority=None, category_id=None):
+    """
+    Get a user's live and archived tasks as one query, with the list filters
+    applied to both tables. Each row carries the task's columns, its
+    category's name and color and an `archived` flag, so a page is one
+    statement with no per-task loads. Returns (query, columns) where columns
+    are the combined query's columns, for sorting and keyset pagination.
+    """
+    # Same column order as listing.LIST_COLUMNS, so rows share row_to_dict()
+    def branch(model, query, archived):
+        return query.outerjoin(Category, Category.id == model.category_id).with_entities(
+            model.id, model.title, model.description, model.due_date, model.priority, model.status,
+            model.user_id, model.category_id,
+            Category.name.label('category_name'), Category.color.label('category_color'),
+            model.created_at, model.updated_at, model.priority_rank,
+            literal(archived).label('archived')
+        ).order_by(None).statement
+
+    listed = union_all(
+        branch(Task, Task.filtered_query(user_id, status, priority, category_id), False),
+        branch(TaskArchive, TaskArchive.filtered_query(user_id, status, priority, category_id), True)
+    ).subquery('listed_tasks')
+    return db.session.query(listed), listed.c
+
+def listed_task_to_dict(row):
+    """
+    Format a listing_query() row like Task.to_dict(), plus the archived flag.
+    """
+    return dict(row_to_dict(row), archived=bool(row.archived))
+
+def archive_batch(cutoff, batch_size=1000, after_id=0):
+    """
+    Move up to batch_size completed tasks last updated before cutoff, with
+    ids above after_id, into tasks_archive. Returns (last id examined,
+    number of tasks moved, user ids); the last id is None when nothing is
+    left to archive. The caller commits.
+    """
+    from .overdue import OverdueEvent
+
+    eligible = (Task.status == 'completed', Task.updated_at < cutoff)
+    candidates = select(Task.id, Task.user_id).where(*eligible, Task.id > after_id).order_by(Task.id).limit(batch_size)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Rows a user is editing right now are left for the next run
+        candidates = candidates.with_for_update(skip_locked=True)
+    rows = db.session.execute(candidates).all()
+    if not rows:
+        return None, 0, set()
+
+    task_ids = [task_id for task_id, _ in rows]
+    # An id can already be archived if SQLite handed it out again before tasks.id
+    # was made AUTOINCREMENT; such tasks stay live rather than collide
+    duplicates = set(db.session.execute(select(TaskArchive.id).where(TaskArchive.id.in_(task_ids))).scalars())
+    if duplicates:
+        logger.warning(f"Not archiving tasks whose ids are already archived: {sorted(duplicates)}")
+        rows = [(task_id, user_id) for task_id, user_id in rows if task_id not in duplicates]
+        if not rows:
+            return task_ids[-1], 0, set()
+    movable_ids = [task_id for task_id, _ in rows]
+
+    # Copy and delete re-check eligibility, in case a task was reopened after it was selected
+    moved = select(*(getattr(Task, name) for name in TASK_COLUMNS), literal(datetime.utcnow())).where(
+        Task.id.in_(movable_ids), *eligible
+    )
+    db.session.execute(insert(TaskArchive).from_select(list(TASK_COLUMNS) + ['archived_at'], moved))
+    db.session.execute(
+        delete(OverdueEvent).where(OverdueEvent.task_id.in_(
+            select(TaskArchive.id).where(TaskArchive.id.in_(movable_ids))
+        )),
+        execution_options={"synchronize_session": False}
+    )
+    archived = db.session.execute(
+        delete(Task).where(Task.id.in_(movable_ids), *eligible),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    return task_ids[-1], archived, {user_id for _, user_id in rows}
+
+def archive_completed_tasks(older_than_days, batch_size=1000, max_batches=None):
+    """
+    Archive completed tasks older than older_than_days, committing after each
+    batch. Yields (number of tasks moved, user ids) per batch.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    after_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        last_id, archived, user_ids = archive_batch(cutoff, batch_size, after_id)
+        if last_id is None:
+            break
+        db.session.commit()
+        batches += 1
+        after_id = last_id
+        yield archived, user_ids
@@ -0,0 +1,227 @@
+# src/task_management/tasks/batch.py
+"""
+Batch task operations for TaskFlow's API.
+A batch is validated as a whole before anything is written, then applied in
+one transaction with a fixed number of statements: one multi-row INSERT for
+the creates, one executemany UPDATE for the updates and completions, one
+DELETE for the deletions and one upsert of the task counters, however many
+tasks the batch touches (plus one insert of overdue events when a batch
+writes tasks that are already past due).
+"""
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, insert, select, update
+from src.task_management.db import db
+from src.task_management.categories.models import Category
+from .models import Task
+from .counters import apply_deltas, counter_key
+from .overdue import is_late_overdue, record_overdue
+from .mutations import UPDATABLE_FIELDS, parse_due_date
+
+OPERATIONS = ('create', 'update', 'complete', 'delete')
+
+class BatchValidationError(ValueError):
+    """
+    Raised when one or more operations in a batch are invalid.
+    errors is a list of per-item result dicts.
+    """
+
+    def __init__(self, errors):
+        super().__init__("Batch rejected; no operations were applied")
+        self.errors = errors
+
+def _error(index, op, status, message):
+    return {"index": index, "op": op, "status": status, "error": message}
+
+def _clean_fields(data, required=False):
+    """
+    Validate and convert the task fields of a create or update operation.
+    Raises ValueError with a client-facing message.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("data must be an object")
+    unknown = set(data) - set(UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if required and (not data.get('title') or not data.get('due_date')):
+        raise ValueError("Title and due date are required")
+    if 'title' in data and (not isinstance(data['title'], str) or not data['title'] or len(data['title']) > 140):
+        raise ValueError("Title must be 1-140 characters")
+
+    values = dict(data)
+    if 'due_date' in values:
+        try:
+            values['due_date'] = parse_due_date(values['due_date'])
+        except ValueError:
+            raise ValueError("Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)")
+    if 'priority' in values:
+        values['priority_rank'] = Task.PRIORITY_RANKS.get(values['priority'], Task.DEFAULT_PRIORITY_RANK)
+    return values
+
+def validate_operations(operations, user_id, max_operations=500):
+    """
+    Check a list of batch operations against the user's tasks and categories.
+    Returns (creates, changes, deletes, previous): creates is a list of
+    (index, values), changes a list of (index, op, row), deletes a list of
+    (index, task_id) and previous maps each referenced task id to its current row.
+    Raises BatchValidationError if any operation is invalid.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchValidationError([_error(None, None, 400, "operations must be a non-empty list")])
+    if len(operations) > max_operations:
+        raise BatchValidationError([_error(None, None, 400, f"A batch may contain at most {max_operations} operations")])
+
+    errors = []
+    parsed = []
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op not in OPERATIONS:
+            errors.append(_error(index, op, 400, f"op must be one of: {', '.join(OPERATIONS)}"))
+            continue
+
+        task_id = operation.get('id')
+        if op != 'create':
+            if not isinstance(task_id, int) or isinstance(task_id, bool):
+                errors.append(_error(index, op, 400, "id must be an integer"))
+                continue
+            # Each task may appear once, so the order operations are applied in never matters
+            if task_id in seen_ids:
+                errors.append(_error(index, op, 400, "A task may only appear once per batch"))
+                continue
+            seen_ids.add(task_id)
+
+        try:
+            if op == 'create':
+                values = _clean_fields(operation.get('data'), required=True)
+            elif op == 'update':
+                values = _clean_fields(operation.get('data'))
+            else:
+                values = {}
+        except ValueError as e:
+            errors.append(_error(index, op, 400, str(e)))
+            continue
+        parsed.append((index, op, task_id, values))
+
+    # Ownership checks for every referenced task and category, one query each
+    owned_tasks = {}
+    if seen_ids:
+        rows = db.session.execute(
+            select(Task.id, Task.user_id, Task.title, Task.description, Task.due_date, Task.priority,
+                   Task.priority_rank, Task.status, Task.category_id)
+            .where(Task.user_id == user_id, Task.id.in_(seen_ids))
+        ).mappings()
+        owned_tasks = {row['id']: dict(row) for row in rows}
+
+    category_ids = {values['category_id'] for _, _, _, values in parsed if values.get('category_id') is not None}
+    owned_categories = set()
+    if category_ids:
+        owned_categories = set(db.session.execute(
+            select(Category.id).where(Category.user_id == user_id, Category.id.in_(category_ids))
+        ).scalars())
+
+    creates, changes, deletes = [], [], []
+    now = datetime.utcnow()
+    for index, op, task_id, values in parsed:
+        if op != 'create' and task_id not in owned_tasks:
+            errors.append(_error(index, op, 404, "Task not found"))
+            continue
+        if values.get('category_id') is not None and values['category_id'] not in owned_categories:
+            errors.append(_error(index, op, 400, "Category not found"))
+            continue
+
+        if op == 'create':
+            # Every row carries every column, so the creates share one multi-row INSERT
+            row = {'description': '', 'priority': 'medium', 'priority_rank': Task.DEFAULT_PRIORITY_RANK,
+                   'status': 'pending', 'category_id': None}
+            row.update(values, user_id=user_id, created_at=now, updated_at=now)
+            creates.append((index, row))
+        elif op == 'delete':
+            deletes.append((index, task_id))
+        else:
+            # Likewise all updates and completions share one executemany UPDATE
+            row = dict(owned_tasks[task_id])
+            row.update(values, updated_at=now)
+            if op == 'complete':
+                row['status'] = 'completed'
+            changes.append((index, op, row))
+
+    if errors:
+        raise BatchValidationError(sorted(errors, key=lambda error: error['index']))
+    return creates, changes, deletes, owned_tasks
+
+def _insert_tasks(rows, user_id):
+    """
+    Insert task rows and return their new ids in the same order.
+    """
+    if db.session.get_bind().dialect.name != 'sqlite':
+        # Postgres returns ids for a batched multi-row INSERT in parameter order
+        return db.session.execute(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    # SQLite can only order RETURNING rows by inserting one row per statement.
+    # A single executemany holds the database write lock until commit, so the
+    # newest len(rows) ids are ours, assigned in insertion order.
+    db.session.execute(insert(Task), rows)
+    new_ids = db.session.execute(
+        select(Task.id).where(Task.user_id == user_id).order_by(Task.id.desc()).limit(len(rows))
+    ).scalars().all()
+    return new_ids[::-1]
+
+def _counter_deltas(creates, changes, deletes, previous):
+    """
+    Net change to the user_task_stats counters made by a batch.
+    """
+    def key(row):
+        return counter_key(row['user_id'], row['status'], row['priority'], row['category_id'])
+
+    deltas = Counter(key(values) for _, values in creates)
+    for _, _, row in changes:
+        deltas[key(previous[row['id']])] -= 1
+        deltas[key(row)] += 1
+    for _, task_id in deletes:
+        deltas[key(previous[task_id])] -= 1
+    return deltas
+
+def _late_overdue(creates, changes, previous, created_ids):
+    """
+    Tasks the batch made open and past due, which the overdue sweep's
+    window may already have passed.
+    """
+    now = datetime.utcnow()
+    late = [
+        (created_ids[index], values['user_id'], values['due_date'])
+        for index, values in creates if is_late_overdue(values['status'], values['due_date'], now)
+    ]
+    for _, _, row in changes:
+        old = previous[row['id']]
+        moved = row['due_date'] != old['due_date'] or row['status'] != old['status']
+        if moved and is_late_overdue(row['status'], row['due_date'], now):
+            late.append((row['id'], row['user_id'], row['due_date']))
+    return late
+
+def apply_operations(creates, changes, deletes, user_id, previous):
+    """
+    Apply validated operations in the current transaction, including their
+    effect on the task counters. Returns {index: task_id} for created tasks.
+    """
+    created_ids = {}
+    if creates:
+        new_ids = _insert_tasks([values for _, values in creates], user_id)
+        created_ids = {index: task_id for (index, _), task_id in zip(creates, new_ids)}
+
+    if changes:
+        # ORM bulk UPDATE by primary key; ownership was checked during validation
+        db.session.execute(update(Task), [row for _, _, row in changes])
+
+    if deletes:
+        db.session.execute(
+            delete(Task).where(Task.user_id == user_id, Task.id.in_([task_id for _, task_id in deletes])),
+            execution_options={"synchronize_session": False}
+        )
+
+    # Bulk statements bypass the flush hooks, so the counters and overdue events are updated here
+    apply_deltas(_counter_deltas(creates, changes, deletes, previous))
+    record_overdue(_late_overdue(creates, changes, previous, created_ids))
+    return created_ids
@@ -0,0 +1,86 @@
+# src/task_management/tasks/benchmark.py
+"""
+Benchmark of the task list serialization paths.
+Times the ORM path (Task instances with their categories, then to_dict())
+against the Core path in listing.py over the same rows, checks that both
+produce identical dicts, and reports rows per second. Without a user id it
+inserts synthetic tasks for a throwaway user inside a transaction that is
+rolled back afterwards.
+"""
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from src.task_management.db import db
+from src.task_management.auth.models import User
+from src.task_management.categories.models import Category
+from .models import Task
+from . import listing
+
+def _synthetic_user(rows):
+    """
+    Insert a user with a few categories and `rows` tasks. Returns the user id.
+    """
+    user = User(username=f"benchmark-{time.time_ns()}", email_id=f"benchmark-{time.time_ns()}@taskflow.invalid",
+                password="!", role="user")
+    db.session.add(user)
+    db.session.flush()
+    categories = [Category(name=f"Benchmark {index}", user_id=user.id) for index in range(5)]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    priorities = list(Task.PRIORITY_RANKS)
+    statuses = ('pending', 'in-progress', 'completed')
+    db.session.execute(insert(Task), [
+        {"title": f"Benchmark task {index}", "description": "Synthetic task for the list benchmark",
+         "due_date": now + timedelta(hours=index), "priority": priorities[index % 3],
+         "priority_rank": Task.PRIORITY_RANKS[priorities[index % 3]], "status": statuses[index % 3],
+         "user_id": user.id, "category_id": categories[index % 6].id if index % 6 < 5 else None,
+         "created_at": now, "updated_at": now}
+        for index in range(rows)
+    ])
+    return user.id
+
+def _orm_page(user_id, rows):
+    query = Task.filtered_query(user_id).options(Task.eager_category()).order_by(Task.due_date, Task.id)
+    tasks = [task.to_dict() for task in query.limit(rows)]
+    # Leave the identity map as empty as the next run will find it
+    db.session.expunge_all()
+    return tasks
+
+def _core_page(user_id, rows):
+    statement = listing.listing_select(user_id).order_by(listing.sort_column('due_date'), Task.__table__.c.id)
+    return [listing.row_to_dict(row) for row in db.session.execute(statement.limit(rows))]
+
+def benchmark_task_list(user_id=None, rows=1000, repeat=5):
+    """
+    Time both listing paths. Returns a dict with rows, repeat, rows/sec per
+    path, the speedup and whether the two outputs were identical.
+    """
+    try:
+        if user_id is None:
+            user_id = _synthetic_user(rows)
+
+        results = {}
+        outputs = {}
+        for name, page in (("orm", _orm_page), ("core", _core_page)):
+            page(user_id, rows)  # warm up statement caches
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[name] = page(user_id, rows)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = len(outputs[name]) / best if best else 0.0
+
+        return {
+            "rows": len(outputs["core"]),
+            "repeat": repeat,
+            "orm_rows_per_sec": results["orm"],
+            "core_rows_per_sec": results["core"],
+            "speedup": results["core"] / results["orm"] if results["orm"] else None,
+            "identical": outputs["orm"] == outputs["core"]
+        }
+    finally:
+        # Nothing is committed; synthetic data disappears with the transaction
+        db.session.rollback()
@@ -0,0 +1,174 @@
+# src/task_management/tasks/counters.py
+"""
+Denormalized per-user task counters for TaskFlow.
+user_task_stats holds one row per (user, status, priority, category) with the
+number of tasks in that combination, so the dashboard's totals and status
+breakdown are a sum over a handful of rows instead of a count over every
+task. Archived tasks (see archive.py) stay counted. Counters change in the
+same transaction as the tasks themselves: ORM writes are picked up when the
+session flushes, and the bulk statements in batch.py and
+Category.merge_into() apply their deltas explicitly.
+"""
+from collections import Counter
+from sqlalchemy import delete, event, func, inspect, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from src.task_management.db import db
+from .models import Task
+
+# category_id stored for uncategorized tasks, so it can be part of the primary key
+NO_CATEGORY = 0
+COUNTED_ATTRIBUTES = ('user_id', 'status', 'priority', 'category_id')
+
+class UserTaskStat(db.Model):
+    """
+    Number of a user's tasks with a given status, priority and category.
+    """
+    __tablename__ = "user_task_stats"
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    priority = db.Column(db.String(20), primary_key=True)
+    category_id = db.Column(db.Integer, primary_key=True, default=NO_CATEGORY)  # 0 = uncategorized
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserTaskStat {self.user_id} {self.status}/{self.priority}/{self.category_id}: {self.task_count}>"
+
+    @staticmethod
+    def status_counts(user_id, status=None, priority=None, category_id=None):
+        """
+        Get {status: task count} for a user with the dashboard filters applied.
+        """
+        query = db.session.query(UserTaskStat.status, func.sum(UserTaskStat.task_count)).filter(
+            UserTaskStat.user_id == user_id
+        )
+        if status:
+            query = query.filter(UserTaskStat.status == status)
+        if priority:
+            query = query.filter(UserTaskStat.priority == priority)
+        if category_id:
+            try:
+                category_id = int(category_id)
+            except (TypeError, ValueError):
+                return {}  # no task can be in a category without an integer id
+            query = query.filter(UserTaskStat.category_id == category_id)
+        return {row_status: int(count or 0) for row_status, count in query.group_by(UserTaskStat.status)}
+
+def counter_key(user_id, status, priority, category_id):
+    return (user_id, status, priority, category_id or NO_CATEGORY)
+
+def apply_deltas(deltas, connection=None):
+    """
+    Add each delta to its counter row, creating rows as needed, with one
+    upsert statement. deltas maps counter_key(...) tuples to +/- counts.
+    """
+    rows = [
+        {"user_id": user_id, "status": status, "priority": priority, "category_id": category_id, "task_count": delta}
+        for (user_id, status, priority, category_id), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    connection = connection or db.session.connection()
+    dialect_insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    statement = dialect_insert(UserTaskStat.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['user_id', 'status', 'priority', 'category_id'],
+        set_={'task_count': UserTaskStat.__table__.c.task_count + statement.excluded.task_count}
+    )
+    connection.execute(statement, rows)
+
+def _previous(state, attribute):
+    """
+    The value an attribute had in the database before this flush.
+    """
+    history = state.attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[attribute].value
+
+def _flush_deltas(session):
+    deltas = Counter()
+    for task in session.new:
+        if isinstance(task, Task):
+            deltas[counter_key(task.user_id, task.status or 'pending', task.priority or 'medium', task.category_id)] += 1
+
+    for task in session.deleted:
+        if isinstance(task, Task):
+            state = inspect(task)
+            deltas[counter_key(*(_previous(state, attribute) for attribute in COUNTED_ATTRIBUTES))] -= 1
+
+    for task in session.dirty:
+        if isinstance(task, Task):
+            state = inspect(task)
+            old = counter_key(*(_previous(state, attribute) for attribute in COUNTED_ATTRIBUTES))
+            new = counter_key(*(getattr(task, attribute) for attribute in COUNTED_ATTRIBUTES))
+            if old != new:
+                deltas[old] -= 1
+                deltas[new] += 1
+    return deltas
+
+@event.listens_for(db.session, 'after_flush')
+def _update_counters(session, flush_context):
+    """
+    Keep user_task_stats in step with ORM task writes, inside the flush's transaction.
+    """
+    apply_deltas(_flush_deltas(session), session.connection())
+
+# Counters need the value a write replaces even when it was never loaded,
+# e.g. an attribute set on a task expired by an earlier commit
+for _attribute in (Task.status, Task.priority, Task.category_id):
+    event.listen(_attribute, 'set', lambda target, value, oldvalue, initiator: None, active_history=True)
+
+def merge_category_counters(source_ids, target_id, user_id):
+    """
+    Move the source categories' counters onto the target category, mirroring
+    Category.merge_into(). Two statements however many counters are involved.
+    """
+    stats = UserTaskStat.__table__
+    moved = select(
+        stats.c.user_id, stats.c.status, stats.c.priority,
+        literal(target_id).label('category_id'), func.sum(stats.c.task_count).label('task_count')
+    ).where(
+        stats.c.user_id == user_id, stats.c.category_id.in_(source_ids)
+    ).group_by(stats.c.user_id, stats.c.status, stats.c.priority)
+
+    connection = db.session.connection()
+    dialect_insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    statement = dialect_insert(stats).from_select(
+        ['user_id', 'status', 'priority', 'category_id', 'task_count'], moved
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=['user_id', 'status', 'priority', 'category_id'],
+        set_={'task_count': stats.c.task_count + statement.excluded.task_count}
+    )
+    connection.execute(statement)
+    connection.execute(delete(stats).where(stats.c.user_id == user_id, stats.c.category_id.in_(source_ids)))
+
+def rebuild_counters(user_id=None):
+    """
+    Recompute user_task_stats from the tasks and tasks_archive tables, for
+    one user or everyone. Returns the number of counter rows written; the
+    caller commits.
+    """
+    from .archive import TaskArchive
+    
+    stats = UserTaskStat.__table__
+    columns = ('user_id', 'status', 'priority', 'category_id')
+    branches = [select(*(table.c[name] for name in columns)) for table in (Task.__table__, TaskArchive.__table__)]
+    wipe = delete(stats)
+    if user_id is not None:
+        wipe = wipe.where(stats.c.user_id == user_id)
+        branches = [branch.where(branch.selected_columns.user_id == user_id) for branch in branches]
+    tasks = union_all(*branches).subquery()
+    counted = select(
+        tasks.c.user_id, tasks.c.status, tasks.c.priority,
+        func.coalesce(tasks.c.category_id, NO_CATEGORY), func.count()
+    ).group_by(tasks.c.user_id, tasks.c.status, tasks.c.priority, func.coalesce(tasks.c.category_id, NO_CATEGORY))
+
+    db.session.execute(wipe)
+    return db.session.execute(
+        stats.insert().from_select(['user_id', 'status', 'priority', 'category_id', 'task_count'], counted)
+    ).rowcount
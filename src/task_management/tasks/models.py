@@ -4,9 +4,10 @@ This model is used to represent fields for task management,
 including title, description, due date, priority, status, category, and assignee.
 The model includes database indexing for performance optimization.
 """
-from sqlalchemy import Index
+from sqlalchemy import DDL, Index, event, func, literal_column
+from sqlalchemy.orm import joinedload, validates
 from ..db import db
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 class Task(db.Model):
     """
@@ -14,13 +15,19 @@ class Task(db.Model):
     """
     __tablename__ = "tasks"
     
+    # Ordinal used to sort and filter by priority; kept in sync with `priority`
+    PRIORITY_RANKS = {"low": 1, "medium": 2, "high": 3}
+    DEFAULT_PRIORITY_RANK = 2
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(140), nullable=False)
     description = db.Column(db.Text, nullable=True)
     due_date = db.Column(db.DateTime, nullable=False)
     priority = db.Column(db.String(20), nullable=False, default="medium")  # low, medium, high
+    priority_rank = db.Column(db.SmallInteger, nullable=False, default=DEFAULT_PRIORITY_RANK,
+                              server_default=str(DEFAULT_PRIORITY_RANK))
     status = db.Column(db.String(20), nullable=False, default="pending")  # pending, in-progress, completed
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -29,13 +36,26 @@ class Task(db.Model):
     user = db.relationship('User', backref=db.backref('user_tasks', lazy='dynamic'))
     category = db.relationship('Category', backref=db.backref('category_tasks', lazy='dynamic'))
     
-    # Indexes for performance optimization
+    # Indexes for performance optimization, shaped like the list filters and sorts
+    # (user_id first, then the filter column, then the sort column and id tie-breaker).
+    # The partial indexes only hold open tasks, which is all the overdue queries read;
+    # their predicate is rendered inline because planners only match it against a literal
     __table_args__ = (
         Index('idx_task_status', status),
         Index('idx_task_due_date', due_date),
-        Index('idx_task_priority', priority),
-        Index('idx_task_user_status', user_id, status),
+        Index('idx_task_user_due', user_id, due_date, id),
+        Index('idx_task_user_created', user_id, created_at, id),
+        Index('idx_task_user_status_due', user_id, status, due_date),
+        Index('idx_task_user_priority_due', user_id, priority_rank, due_date),
         Index('idx_task_category_status', category_id, status),
+        Index('idx_task_user_open_due', user_id, due_date,
+              postgresql_where=status != literal_column("'completed'"),
+              sqlite_where=status != literal_column("'completed'")),
+        Index('idx_task_open_due', due_date,
+              postgresql_where=status != literal_column("'completed'"),
+              sqlite_where=status != literal_column("'completed'")),
+        # Ids are never reused, so an archived task's id can't be handed out again
+        {'sqlite_autoincrement': True},
     )
     
     def __repr__(self):
@@ -44,6 +64,14 @@ class Task(db.Model):
         """
         return f"<Task {self.id}: {self.title}>"
     
+    @validates('priority')
+    def validate_priority(self, key, priority):
+        """
+        Keep priority_rank in step whenever priority is assigned.
+        """
+        self.priority_rank = Task.PRIORITY_RANKS.get(priority, Task.DEFAULT_PRIORITY_RANK)
+        return priority
+    
     def to_dict(self):
         """
         Convert the Task object to a dictionary for API responses.
@@ -66,6 +94,105 @@ class Task(db.Model):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @staticmethod
+    def eager_category():
+        """
+        Query option loading each task's category in the same SELECT,
+        so to_dict() never triggers a lazy load per task.
+        """
+        return joinedload(Task.category)
+    
+    @staticmethod
+    def get_with_category(task_id):
+        """
+        (Re)load a task together with its category in a single query.
+        Used after a commit, when the instance's attributes are expired.
+        """
+        return Task.query.options(Task.eager_category()).filter_by(id=task_id).populate_existing().first()
+    
+    @staticmethod
+    def is_open():
+        """
+        Filter for tasks that are not completed, matching the open-task partial indexes.
+        """
+        return Task.status != literal_column("'completed'")
+    
+    @staticmethod
+    def list_filters(user_id, status=None, priority=None, category_id=None):
+        """
+        Get the WHERE conditions for a user's tasks with the optional list filters.
+        Shared by filtered_query() and the Core listing path in listing.py.
+        """
+        table = Task.__table__
+        conditions = [table.c.user_id == user_id]
+        if status:
+            conditions.append(table.c.status == status)
+        if priority:
+            # Filter on the indexed ordinal when the priority is a known one
+            if priority in Task.PRIORITY_RANKS:
+                conditions.append(table.c.priority_rank == Task.PRIORITY_RANKS[priority])
+            else:
+                conditions.append(table.c.priority == priority)
+        if category_id:
+            conditions.append(table.c.category_id == category_id)
+        return conditions
+    
+    @staticmethod
+    def filtered_query(user_id, status=None, priority=None, category_id=None):
+        """
+        Get a user's tasks with the optional list filters applied.
+        """
+        return Task.query.filter(*Task.list_filters(user_id, status, priority, category_id))
+    
+    @staticmethod
+    def sort_column(sort):
+        """
+        Map a sort parameter to its column, defaulting to the due date.
+        """
+        if sort == 'priority':
+            return Task.priority_rank
+        if sort == 'created_at':
+            return Task.created_at
+        return Task.due_date
+    
+    @staticmethod
+    def data_version(user_id):
+        """
+        Get (task count, latest update time) for a user, used as an HTTP validator.
+        """
+        return db.session.query(func.count(Task.id), func.max(Task.updated_at)).filter(
+            Task.user_id == user_id
+        ).one()
+    
+    @staticmethod
+    def dashboard_stats(user_id, status=None, priority=None, category_id=None, today=None):
+        """
+        Get the dashboard's task counts.
+        Totals by status come from the user_task_stats counters; overdue and
+        due-today counts only include tasks that are not completed and are
+        counted from the open tasks due by the end of today.
+        """
+        from .counters import UserTaskStat
+        
+        counts = UserTaskStat.status_counts(user_id, status, priority, category_id)
+        start_of_day = datetime.combine(today or datetime.now().date(), time.min)
+        end_of_day = start_of_day + timedelta(days=1)
+        
+        overdue, due_today = Task.filtered_query(user_id, status, priority, category_id).filter(
+            Task.is_open(), Task.due_date < end_of_day
+        ).with_entities(
+            func.count(Task.id).filter(Task.due_date < start_of_day),
+            func.count(Task.id).filter(Task.due_date >= start_of_day)
+        ).one()
+        return {
+            "total": sum(counts.values()),
+            "completed": counts.get('completed', 0),
+            "in_progress": counts.get('in-progress', 0),
+            "pending": counts.get('pending', 0),
+            "overdue": overdue,
+            "due_today": due_today
+        }
+    
     @staticmethod
     def get_tasks_by_status(user_id, status=None):
         """
@@ -88,7 +215,7 @@ class Task(db.Model):
         """
         Get tasks filtered by priority.
         """
-        return Task.query.filter_by(user_id=user_id, priority=priority).order_by(Task.due_date.asc())
+        return Task.filtered_query(user_id, priority=priority).order_by(Task.due_date.asc())
     
     @staticmethod
     def get_overdue_tasks(user_id):
@@ -96,8 +223,8 @@ class Task(db.Model):
         Get overdue tasks for a user.
         """
         return Task.query.filter_by(user_id=user_id).filter(
-            Task.due_date < datetime.utcnow(),
-            Task.status != 'completed'
+            Task.is_open(),
+            Task.due_date < datetime.utcnow()
         ).order_by(Task.due_date.asc())
     
     def complete(self):
@@ -106,4 +233,41 @@ class Task(db.Model):
         """
         self.status = 'completed'
         self.updated_at = datetime.utcnow()
-        db.session.commit()
\ No newline at end of file
+        db.session.commit()
+
+
+# Full-text search structures the ORM does not model (see tasks/search.py).
+# They are created with the table; migration 0003 adds them to existing databases.
+SEARCH_DDL = {
+    'postgresql': [
+        # Kept current by a trigger rather than a generated column, which the
+        # migration could only add by rewriting the table
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        "NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B'); RETURN NEW; END $$ LANGUAGE plpgsql",
+        "CREATE TRIGGER tasks_search_vector_update BEFORE INSERT OR UPDATE OF title, description ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()",
+        "CREATE INDEX IF NOT EXISTS idx_task_search ON tasks USING GIN (search_vector)",
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+        "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+for _dialect, _statements in SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Task.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect='sqlite'))
+event.listen(Task.__table__, 'after_drop',
+             DDL("DROP FUNCTION IF EXISTS tasks_search_vector_update()").execute_if(dialect='postgresql'))
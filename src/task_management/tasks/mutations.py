@@ -0,0 +1,159 @@
+# src/task_management/tasks/mutations.py
+"""
+Single-statement task updates for TaskFlow's API.
+Updating or completing a task is one conditional UPDATE ... WHERE id AND
+user_id that returns the response columns (category name and color
+included), instead of loading the Task, flushing it and loading it again to
+serialize it. On PostgreSQL the counter deltas and any late overdue event
+are written by the same statement, from the locked pre-update row in a
+WITH clause, so a write is one round trip. Other backends cannot return the
+values a row had before the update, so they lock and read them first and
+apply the counters separately; without UPDATE ... RETURNING the updated row
+is selected back.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, and_, func, literal, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql
+from src.task_management.db import db
+from src.task_management.categories.models import Category
+from .models import Task
+from .counters import NO_CATEGORY, UserTaskStat, apply_deltas, counter_key
+from .overdue import OverdueEvent, is_late_overdue, record_overdue
+
+tasks_table = Task.__table__
+categories_table = Category.__table__
+
+UPDATABLE_FIELDS = ('title', 'description', 'due_date', 'priority', 'status', 'category_id')
+
+def _category_column(column, label):
+    return select(column).where(
+        categories_table.c.id == tasks_table.c.category_id
+    ).correlate(tasks_table).scalar_subquery().label(label)
+
+# Same order as listing.LIST_COLUMNS, so rows are formatted with row_to_dict()
+RETURNED_COLUMNS = (
+    tasks_table.c.id, tasks_table.c.title, tasks_table.c.description, tasks_table.c.due_date,
+    tasks_table.c.priority, tasks_table.c.status, tasks_table.c.user_id, tasks_table.c.category_id,
+    _category_column(categories_table.c.name, 'category_name'),
+    _category_column(categories_table.c.color, 'category_color'),
+    tasks_table.c.created_at, tasks_table.c.updated_at,
+)
+
+def _utc_naive(due_date):
+    # Stored due dates are naive UTC; an offset is converted, never dropped
+    if due_date is not None and due_date.tzinfo is not None:
+        return due_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return due_date
+
+def parse_due_date(value):
+    """
+    Parse an ISO 8601 due date sent to the API into the naive UTC datetime
+    it is stored as. Raises ValueError if it is not a valid date.
+    """
+    return _utc_naive(datetime.fromisoformat(str(value).replace('Z', '+00:00')))
+
+def _column_values(values):
+    """
+    Task column values for an update, with updated_at and priority_rank set
+    the way the ORM would.
+    """
+    values = {name: value for name, value in values.items() if name in UPDATABLE_FIELDS}
+    if 'due_date' in values:
+        values['due_date'] = _utc_naive(values['due_date'])
+    if 'priority' in values:
+        values['priority_rank'] = Task.PRIORITY_RANKS.get(values['priority'], Task.DEFAULT_PRIORITY_RANK)
+    values['updated_at'] = datetime.utcnow()
+    return values
+
+def update_task(user_id, task_id, values):
+    """
+    Apply values ({field: value}) to one of a user's tasks, including the
+    effect on the task counters and overdue events. Returns the updated row
+    (RETURNED_COLUMNS), or None if the user has no such task. The caller commits.
+    """
+    values = _column_values(values)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _update_in_one_statement(user_id, task_id, values)
+    return _update_emulated(user_id, task_id, values)
+
+def _update_in_one_statement(user_id, task_id, values):
+    # Locking the row in the WITH clause makes it the latest committed version,
+    # so the deltas below start from what the UPDATE actually replaces
+    old = select(
+        tasks_table.c.id, tasks_table.c.user_id, tasks_table.c.status, tasks_table.c.priority,
+        tasks_table.c.category_id, tasks_table.c.due_date
+    ).where(tasks_table.c.id == task_id, tasks_table.c.user_id == user_id).with_for_update().cte('old_task')
+
+    def new(name):
+        if name in values:
+            return literal(values[name], tasks_table.c[name].type)
+        return old.c[name]
+
+    statement = update(tasks_table).where(
+        tasks_table.c.id == old.c.id, tasks_table.c.user_id == user_id
+    ).values(values).returning(*RETURNED_COLUMNS)
+
+    new_category = func.coalesce(new('category_id'), NO_CATEGORY)
+    old_category = func.coalesce(old.c.category_id, NO_CATEGORY)
+    counted_changes = [new(name) != old.c[name] for name in ('status', 'priority') if name in values]
+    if 'category_id' in values:
+        counted_changes.append(new_category != old_category)
+    if counted_changes:
+        moved = or_(*counted_changes)
+        deltas = union_all(
+            select(old.c.user_id, new('status'), new('priority'), new_category, literal(1)).where(moved),
+            select(old.c.user_id, old.c.status, old.c.priority, old_category, literal(-1)).where(moved)
+        )
+        stats = UserTaskStat.__table__
+        counted = postgresql.insert(stats).from_select(
+            ['user_id', 'status', 'priority', 'category_id', 'task_count'], deltas
+        )
+        counted = counted.on_conflict_do_update(
+            index_elements=['user_id', 'status', 'priority', 'category_id'],
+            set_={'task_count': stats.c.task_count + counted.excluded.task_count}
+        )
+        statement = statement.add_cte(counted.cte('counted_task'))
+
+    # Completing a task never makes it overdue
+    if {'status', 'due_date'} & set(values) and values.get('status') != 'completed':
+        now = datetime.utcnow()
+        late = select(old.c.id, old.c.user_id, new('due_date'), literal(now, DateTime)).where(
+            new('status') != 'completed', new('due_date') < now,
+            or_(*(new(name) != old.c[name] for name in ('status', 'due_date') if name in values))
+        )
+        recorded = postgresql.insert(OverdueEvent.__table__).from_select(
+            ['task_id', 'user_id', 'due_date', 'detected_at'], late
+        ).on_conflict_do_nothing(index_elements=['task_id', 'due_date'])
+        statement = statement.add_cte(recorded.cte('late_task'))
+
+    return db.session.execute(statement).first()
+
+def _update_emulated(user_id, task_id, values):
+    owned = and_(tasks_table.c.id == task_id, tasks_table.c.user_id == user_id)
+    old = db.session.execute(
+        select(tasks_table.c.status, tasks_table.c.priority, tasks_table.c.category_id, tasks_table.c.due_date)
+        .where(owned).with_for_update()
+    ).first()
+    if old is None:
+        return None
+
+    statement = update(tasks_table).where(owned).values(values)
+    if db.session.get_bind().dialect.update_returning:
+        row = db.session.execute(statement.returning(*RETURNED_COLUMNS)).first()
+    else:
+        db.session.execute(statement)
+        row = db.session.execute(select(*RETURNED_COLUMNS).where(owned)).first()
+
+    # The statements above bypass the flush hooks
+    deltas = Counter()
+    old_key = counter_key(user_id, old.status, old.priority, old.category_id)
+    new_key = counter_key(user_id, row.status, row.priority, row.category_id)
+    if old_key != new_key:
+        deltas[old_key] -= 1
+        deltas[new_key] += 1
+    apply_deltas(deltas)
+    moved = row.due_date != old.due_date or row.status != old.status
+    if moved and is_late_overdue(row.status, row.due_date, datetime.utcnow()):
+        record_overdue([(row.id, row.user_id, row.due_date)])
+    return row
@@ -0,0 +1,141 @@
+# src/task_management/tasks/overdue.py
+"""
+Incremental overdue sweep for TaskFlow.
+A scheduled `flask sweep-overdue` records every open task whose due date
+passed since the previous run in overdue_events, for reminders and badges to
+consume. The sweep only reads the window between its stored high-water mark
+and now, through the open-task partial index, so it never rescans tasks it
+has already seen or tasks that are completed. Tasks that land behind the
+mark (created or rescheduled with a past due date, or reopened) are recorded
+when they are flushed instead.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, event, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from src.task_management.db import db
+from .models import Task
+
+SWEEP_NAME = 'overdue'
+
+class SweepMark(db.Model):
+    """
+    How far a named incremental job has processed.
+    """
+    __tablename__ = "sweep_marks"
+
+    name = db.Column(db.String(50), primary_key=True)
+    high_water = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SweepMark {self.name}: {self.high_water}>"
+
+class OverdueEvent(db.Model):
+    """
+    A task that became overdue, recorded once per due date.
+    """
+    __tablename__ = "overdue_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    due_date = db.Column(db.DateTime, nullable=False)
+    detected_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # A rescheduled task can become overdue again, but each due date only once
+        db.UniqueConstraint('task_id', 'due_date', name='uq_overdue_task_due'),
+        db.Index('idx_overdue_user_event', 'user_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f"<OverdueEvent task {self.task_id} due {self.due_date}>"
+
+    @staticmethod
+    def for_user(user_id, after_id=0, limit=100):
+        """
+        Get a user's overdue events newer than after_id, oldest first,
+        so a consumer can resume from the last id it handled.
+        """
+        return OverdueEvent.query.filter(
+            OverdueEvent.user_id == user_id, OverdueEvent.id > after_id
+        ).order_by(OverdueEvent.id).limit(limit).all()
+
+def _insert_ignoring_duplicates(connection):
+    dialect_insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    return dialect_insert(OverdueEvent.__table__).on_conflict_do_nothing(index_elements=['task_id', 'due_date'])
+
+def sweep_overdue(now=None):
+    """
+    Record the open tasks that became overdue since the last sweep and move
+    the high-water mark to now. Returns the number of new events; the caller
+    commits, so the events and the mark are saved together.
+    """
+    now = now or datetime.utcnow()
+    mark = db.session.get(SweepMark, SWEEP_NAME, with_for_update=True)
+
+    tasks = Task.__table__
+    newly_overdue = select(
+        tasks.c.id, tasks.c.user_id, tasks.c.due_date, literal(now, DateTime)
+    ).where(Task.is_open(), tasks.c.due_date < now)
+    if mark is not None:
+        newly_overdue = newly_overdue.where(tasks.c.due_date >= mark.high_water)
+
+    connection = db.session.connection()
+    recorded = connection.execute(
+        _insert_ignoring_duplicates(connection).from_select(
+            ['task_id', 'user_id', 'due_date', 'detected_at'], newly_overdue
+        )
+    ).rowcount
+
+    if mark is None:
+        db.session.add(SweepMark(name=SWEEP_NAME, high_water=now))
+    elif now > mark.high_water:
+        mark.high_water = now
+    return recorded
+
+def is_late_overdue(status, due_date, now):
+    """
+    True for an open task whose due date has already passed.
+    """
+    if status == 'completed' or due_date is None:
+        return False
+    if due_date.tzinfo is not None:
+        due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return due_date < now
+
+def record_overdue(tasks, connection=None):
+    """
+    Record (task_id, user_id, due_date) tuples as overdue events, skipping
+    ones already recorded. Used for writes that may land behind the sweep's
+    high-water mark; ORM flushes are handled automatically.
+    """
+    if not tasks:
+        return
+    now = datetime.utcnow()
+    connection = connection or db.session.connection()
+    connection.execute(_insert_ignoring_duplicates(connection), [
+        {"task_id": task_id, "user_id": user_id, "due_date": due_date, "detected_at": now}
+        for task_id, user_id, due_date in tasks
+    ])
+
+def _late_overdue(session):
+    """
+    Tasks in this flush that are open and already past due, and whose due
+    date or status changed, so the sweep window may have passed them.
+    """
+    now = datetime.utcnow()
+    late = []
+    for task in list(session.new) + list(session.dirty):
+        if not isinstance(task, Task) or not is_late_overdue(task.status, task.due_date, now):
+            continue
+        if task not in session.new:
+            state = db.inspect(task)
+            if not (state.attrs.due_date.history.has_changes() or state.attrs.status.history.has_changes()):
+                continue
+        late.append((task.id, task.user_id, task.due_date))
+    return late
+
+@event.listens_for(db.session, 'after_flush')
+def _record_late_overdue(session, flush_context):
+    record_overdue(_late_overdue(session), session.connection())
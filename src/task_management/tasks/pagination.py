@@ -0,0 +1,80 @@
+# src/task_management/tasks/pagination.py
+"""
+Keyset (cursor) pagination helpers for task listings.
+Pages are addressed by the (sort column, id) of the last row already seen,
+so each page is a bounded index range scan instead of an OFFSET scan, and no
+COUNT(*) is needed to know whether another page exists.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import Select, tuple_
+from src.task_management.db import db
+
+def encode_cursor(sort, order, sort_value, task_id):
+    """
+    Build an opaque cursor pointing just after the given row.
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort, order, sort_value, task_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, sort, order, is_datetime=False):
+    """
+    Decode a cursor produced by encode_cursor() for the same sort and order.
+    Raises ValueError if the cursor is malformed or was issued for another ordering.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_order, sort_value, task_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("Cursor does not match the requested sort order")
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise ValueError("Invalid cursor")
+    if sort_value is not None:
+        # The sort value goes into the query, so only the type its column holds is accepted
+        try:
+            if is_datetime:
+                if not isinstance(sort_value, str):
+                    raise ValueError
+                sort_value = datetime.fromisoformat(sort_value)
+            elif not isinstance(sort_value, (int, float)) or isinstance(sort_value, bool):
+                raise ValueError
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    return sort_value, task_id
+
+def keyset_page(query, model, sort, sort_column, order, per_page, cursor=None):
+    """
+    Fetch one page of query ordered by (sort_column, id).
+    query is an ORM Query or a Core Select; model is anything with an id
+    column: a model class, or the .c of a table or subquery.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    id_column = model.id
+    if cursor:
+        is_datetime = getattr(sort_column.type, 'python_type', None) is datetime
+        sort_value, last_id = decode_cursor(cursor, sort, order, is_datetime)
+        if order == 'desc':
+            query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, last_id))
+        else:
+            query = query.filter(tuple_(sort_column, id_column) > tuple_(sort_value, last_id))
+
+    if order == 'desc':
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether a next page exists
+    query = query.limit(per_page + 1)
+    items = db.session.execute(query).all() if isinstance(query, Select) else query.all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(sort, order, getattr(last, sort_column.key), last.id)
+    return items, next_cursor
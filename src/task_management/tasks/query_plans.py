@@ -0,0 +1,66 @@
+# src/task_management/tasks/query_plans.py
+"""
+EXPLAIN checks for the task list query shapes.
+Each shape is built with the same helpers the views use, and its plan is
+checked for the composite index that is meant to serve it, so a schema or
+query change that silently falls back to a table scan is caught.
+"""
+from sqlalchemy import desc, text
+from src.task_management.db import db
+from .models import Task
+
+def query_shapes(user_id):
+    """
+    Return (description, query, expected index) for each list query shape.
+    The expected index may be a tuple of acceptable indexes, preferred first.
+    """
+    return [
+        ("list sorted by due date",
+         Task.filtered_query(user_id).order_by(Task.due_date, Task.id),
+         'idx_task_user_due'),
+        ("list sorted by due date, newest first",
+         Task.filtered_query(user_id).order_by(desc(Task.due_date), desc(Task.id)),
+         'idx_task_user_due'),
+        ("list sorted by creation time",
+         Task.filtered_query(user_id).order_by(Task.created_at, Task.id),
+         'idx_task_user_created'),
+        ("status filter sorted by due date",
+         Task.filtered_query(user_id, status='pending').order_by(Task.due_date),
+         'idx_task_user_status_due'),
+        ("priority filter sorted by due date",
+         Task.filtered_query(user_id, priority='high').order_by(Task.due_date),
+         'idx_task_user_priority_due'),
+        # SQLite without table statistics rates the full index level with the partial one
+        ("overdue tasks",
+         Task.get_overdue_tasks(user_id),
+         ('idx_task_user_open_due', 'idx_task_user_due')),
+    ]
+
+def explain(connection, query):
+    """
+    Return the database's plan for a query as text.
+    """
+    sql = str(query.statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == 'sqlite':
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in connection.execute(text(f"EXPLAIN {sql}")))
+
+def check_task_indexes(user_id=1):
+    """
+    EXPLAIN every list query shape.
+    Returns a list of (description, expected index, plan, uses_index) tuples.
+    """
+    results = []
+    with db.engine.connect() as connection:
+        with connection.begin() as transaction:
+            if connection.dialect.name == 'postgresql':
+                # Small tables are cheaper to scan; ask whether the index is usable at all
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+            for description, query, index_name in query_shapes(user_id):
+                plan = explain(connection, query)
+                index_names = index_name if isinstance(index_name, tuple) else (index_name,)
+                results.append((description, ' or '.join(index_names), plan,
+                                any(name in plan for name in index_names)))
+            transaction.rollback()
+    return results
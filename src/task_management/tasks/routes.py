@@ -4,6 +4,7 @@ This module handles task management routes for the TaskFlow application.
 It supports adding, viewing, editing, deleting, and categorizing tasks,
 with both web UI and API endpoints.
 """
+import hashlib
 from datetime import datetime
 from flask import Flask,Blueprint, request, jsonify, flash, redirect, render_template, url_for, make_response, current_app
 from flask_login import login_required, current_user
@@ -12,8 +13,16 @@ from sqlalchemy import desc
 from .models import Task
 from src.task_management.categories.models import Category
 from src.task_management.auth.routes import token_required
-from src.task_management.db import db, optimize_query
-from src.task_management.cache.redis_client import cache_data, invalidate_cache
+from src.task_management.db import db, optimize_query, query_budget
+from src.task_management.replicas import primary_only
+from .pagination import keyset_page
+from .batch import BatchValidationError, validate_operations, apply_operations
+from .mutations import UPDATABLE_FIELDS, parse_due_date, update_task
+from .search import SearchUnavailable, search_tasks
+from .archive import listed_task_to_dict, listing_query
+from . import listing
+from src.task_management.cache.redis_client import cache_data, bump_generation, set_cached
+from src.task_management.cache.conditional import compute_validators, is_not_modified, not_modified, apply_validators
 from datetime import datetime
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -51,6 +60,48 @@ def limit_route(limit_string):
         return decorated_function
     return decorator
 
+def task_cache_key(task_id, user_id):
+    """
+    Cache key and namespaces of a single task's API payload.
+    """
+    return f'task_{task_id}_user_{user_id}', [f'task_{task_id}', f'user_categories_{user_id}']
+
+def refresh_task_cache(task_data):
+    """
+    Update caches after a committed task write.
+    The task's detail entry and the list pages are invalidated; in
+    write-through mode the new payload is then stored under the task's new
+    generation so the next read is a cache hit. Bumping first means a reader
+    that loaded the row before the commit can only write its stale payload
+    under the old generation, which nobody reads any more.
+    """
+    user_id = task_data['user_id']
+    bump_generation(f'user_tasks_{user_id}', f'task_{task_data["id"]}')
+    if current_app.config.get('CACHE_WRITE_THROUGH', True):
+        key, namespaces = task_cache_key(task_data['id'], user_id)
+        set_cached(key, {"task": task_data}, expire=300, namespaces=namespaces)
+
+
+def dashboard_page(user_id, status, priority, category_id, sort, order, current_date, cursor=None):
+    """
+    Fetch one page of the dashboard task list.
+    Returns (tasks, next_cursor); raises ValueError for an invalid cursor.
+    """
+    order = 'desc' if order == 'desc' else 'asc'
+    query = Task.filtered_query(user_id, status, priority, category_id).options(Task.eager_category())
+    tasks, next_cursor = keyset_page(
+        query, Task, sort, Task.sort_column(sort), order,
+        current_app.config.get('DASHBOARD_PAGE_SIZE', 50), cursor
+    )
+    
+    # Enhance tasks with additional data
+    for task in tasks:
+        # Convert datetime to date for comparison 
+        task_due_date = task.due_date.date() if hasattr(task.due_date, 'date') else task.due_date
+        task.is_overdue = task_due_date < current_date
+        task.is_due_today = task_due_date == current_date
+    return tasks, next_cursor
+
 
 # Web UI Routes
 @task_bp.route('/dashboard', methods=['GET'])
@@ -64,72 +115,39 @@ def dashboard():
     # Get filter parameters
     status = request.args.get('status')
     priority = request.args.get('priority')
-    category_id = request.args.get('category_id')
+    category_id = request.args.get('category_id', type=int)  # a non-numeric id is ignored
     sort = request.args.get('sort', 'due_date')
     order = request.args.get('order', 'asc')
     
-    # Base query
-    query = Task.query.filter_by(user_id=current_user.id)
-    
-    # Apply filters
-    if status:
-        query = query.filter_by(status=status)
-    if priority:
-        query = query.filter_by(priority=priority)
-    if category_id:
-        query = query.filter_by(category_id=category_id)
-    
-    # Apply sorting
-    if sort == 'due_date':
-        sort_column = Task.due_date
-    elif sort == 'priority':
-        sort_column = Task.priority
-    elif sort == 'created_at':
-        sort_column = Task.created_at
-    else:
-        sort_column = Task.due_date
+    # Get current date for template
+    current_date = datetime.now().date()
     
-    if order == 'desc':
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(sort_column)
+    # Counts for the stat cards and progress bars come from one aggregate query
+    stats = Task.dashboard_stats(current_user.id, status, priority, category_id, current_date)
     
-    # Execute query
-    tasks = query.all()
+    # Only the first page is rendered; further pages are fetched on scroll
+    tasks, next_cursor = dashboard_page(current_user.id, status, priority, category_id, sort, order, current_date)
     
     # Get all categories for filter dropdown
     categories = Category.query.filter_by(user_id=current_user.id).all()
     
-    # Get current date for template
-    current_date = datetime.now().date()
-    
-    # Calculate task stats for progress bars
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task.status == 'completed')
-    in_progress_tasks = sum(1 for task in tasks if task.status == 'in-progress')
-    pending_tasks = sum(1 for task in tasks if task.status == 'pending')
-    
     # Calculate percentages for progress bars
+    total_tasks = stats['total']
     if total_tasks > 0:
-        completed_percent = int((completed_tasks / total_tasks) * 100)
-        in_progress_percent = int((in_progress_tasks / total_tasks) * 100)
-        pending_percent = int((pending_tasks / total_tasks) * 100)
+        completed_percent = round(stats['completed'] / total_tasks * 100)
+        in_progress_percent = round(stats['in_progress'] / total_tasks * 100)
+        pending_percent = round(stats['pending'] / total_tasks * 100)
     else:
         completed_percent = 0
         in_progress_percent = 0
         pending_percent = 0
     
-    # Enhance tasks with additional data
-    for task in tasks:
-        # Convert datetime to date for comparison 
-        task_due_date = task.due_date.date() if hasattr(task.due_date, 'date') else task.due_date
-        task.is_overdue = task_due_date < current_date
-        task.is_due_today = task_due_date == current_date
-    
     # Set cache control headers
     response = make_response(render_template(
         'dashboard.html',
         tasks=tasks,
+        next_cursor=next_cursor,
+        stats=stats,
         categories=categories,
         current_date=current_date,
         all_categories=categories,  # For backward compatibility
@@ -142,14 +160,47 @@ def dashboard():
     response.headers['Expires'] = '0'
     return response
 
+@task_bp.route('/dashboard/tasks', methods=['GET'])
+@login_required
+@limit_route("5000 per day")
+def dashboard_tasks():
+    """
+    Return the next page of dashboard tasks as pre-rendered list items.
+    Accepts the dashboard's filter and sort parameters plus the cursor it was given.
+    """
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return jsonify({"error": "A cursor is required"}), 400
+    
+    current_date = datetime.now().date()
+    try:
+        tasks, next_cursor = dashboard_page(
+            current_user.id,
+            request.args.get('status'),
+            request.args.get('priority'),
+            request.args.get('category_id', type=int),
+            request.args.get('sort', 'due_date'),
+            request.args.get('order', 'asc'),
+            current_date,
+            cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "html": render_template('_task_items.html', tasks=tasks, current_date=current_date),
+        "next_cursor": next_cursor
+    }), 200
+
 @task_bp.route('/add_task', methods=['GET', 'POST'])
+@primary_only
 @login_required
 def add_new_task():
     """Handle adding/creating new tasks with category support."""
     # Get all categories for the dropdown
     categories = Category.query.filter_by(user_id=current_user.id).all()
-    # Create Uncategorized category if it doesn't exist
-    uncategorized = Category.query.filter_by(name="Uncategorized", user_id=current_user.id).first()
+    # Create Uncategorized category if it doesn't exist (checked in the list already loaded)
+    uncategorized = next((category for category in categories if category.name == "Uncategorized"), None)
     if not uncategorized:
         uncategorized = Category(
             name="Uncategorized",
@@ -159,6 +210,7 @@ def add_new_task():
         )
         db.session.add(uncategorized)
         db.session.commit()
+        bump_generation(f'user_categories_{current_user.id}')
         categories.append(uncategorized)
     
     if request.method == 'POST':
@@ -190,10 +242,13 @@ def add_new_task():
             )
             
             db.session.add(new_task)
+            db.session.flush()
+            task_id = new_task.id
             db.session.commit()
             
-            # Invalidate cache
-            invalidate_cache(f'user_tasks_{current_user.id}')
+            # Update cache
+            new_task = Task.get_with_category(task_id)
+            refresh_task_cache(new_task.to_dict())
             
             # Send Slack notification if enabled
             if current_app.config.get('SLACK_ENABLED', False) and hasattr(current_app, 'slack_notifier'):
@@ -242,9 +297,9 @@ def edit_task(task_id):
             
             db.session.commit()
             
-            # Invalidate cache
-            invalidate_cache(f'user_tasks_{current_user.id}')
-            invalidate_cache(f'task_{task_id}')
+            # Update cache
+            task = Task.get_with_category(task_id)
+            refresh_task_cache(task.to_dict())
             
             flash("Task updated successfully", "success")
             return redirect(url_for('tasks.dashboard'))
@@ -262,12 +317,12 @@ def delete_task(task_id):
     task = Task.query.filter_by(id=task_id, user_id=current_user.id).first_or_404()
     
     try:
+        user_id = task.user_id
         db.session.delete(task)
         db.session.commit()
         
         # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
-        invalidate_cache(f'task_{task_id}')
+        bump_generation(f'user_tasks_{user_id}', f'task_{task_id}')
         
         flash("Task deleted successfully", "success")
     except Exception as e:
@@ -277,6 +332,7 @@ def delete_task(task_id):
     return redirect(url_for('tasks.dashboard'))
 
 @task_bp.route('/complete_task/<int:task_id>', methods=['GET','POST'])
+@primary_only
 @login_required
 def complete_task(task_id):
     """Mark a task as completed."""
@@ -287,9 +343,9 @@ def complete_task(task_id):
         task.updated_at = datetime.utcnow()
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
-        invalidate_cache(f'task_{task_id}')
+        # Update cache
+        task = Task.get_with_category(task_id)
+        refresh_task_cache(task.to_dict())
         
         # Send Slack notification if enabled
         if current_app.config.get('SLACK_ENABLED', False) and hasattr(current_app, 'slack_notifier'):
@@ -304,6 +360,7 @@ def complete_task(task_id):
 
 # API Routes
 @task_bp.route('/api/tasks', methods=['GET'])
+@query_budget(5)
 @token_required
 def api_get_tasks(current_user):
     """
@@ -318,55 +375,195 @@ def api_get_tasks(current_user):
     per_page = min(int(request.args.get('per_page', 20)), 100)  # Cap at 100 items per page
     sort = request.args.get('sort', 'due_date')
     order = request.args.get('order', 'asc')
+    cursor = request.args.get('cursor')
+    include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+    namespaces = [f'user_tasks_{current_user.id}', f'user_categories_{current_user.id}']
+    
+    # Answer revalidation requests without running the query
+    etag, last_modified = compute_validators(current_user.id, namespaces, fallback=lambda: [
+        Task.data_version(current_user.id), Category.data_version(current_user.id)
+    ])
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    
+    # Keyset mode: opt in with pagination=cursor or by passing a cursor
+    if cursor or request.args.get('pagination') == 'cursor':
+        return api_get_tasks_by_cursor(
+            current_user, namespaces, etag, last_modified,
+            status, priority, category_id, per_page, sort, order, cursor, include_archived
+        )
     
     # Try to get from cache first
-    @cache_data(f'user_tasks_{current_user.id}_{status}_{priority}_{category_id}_{page}_{per_page}_{sort}_{order}', expire=300)
+    @cache_data(
+        f'user_tasks_{current_user.id}_{status}_{priority}_{category_id}_{page}_{per_page}_{sort}_{order}'
+        + ('_archived' if include_archived else ''),
+        expire=300,
+        namespaces=namespaces,
+        lock=True,
+        early_beta=1.0
+    )
     def get_tasks():
-        # Base query
-        query = Task.query.filter_by(user_id=current_user.id)
-        
-        # Apply filters
-        if status:
-            query = query.filter_by(status=status)
-        if priority:
-            query = query.filter_by(priority=priority)
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-        
-        # Apply sorting
-        if sort == 'due_date':
-            sort_column = Task.due_date
-        elif sort == 'priority':
-            sort_column = Task.priority
-        elif sort == 'created_at':
-            sort_column = Task.created_at
+        if include_archived:
+            query, columns = listing_query(current_user.id, status, priority, category_id)
+            sort_column, id_column = columns[Task.sort_column(sort).key], columns.id
         else:
-            sort_column = Task.due_date
+            # Read-only Core rows with the category joined in, no ORM instances
+            query = listing.listing_select(current_user.id, status, priority, category_id)
+            sort_column, id_column = listing.sort_column(sort), Task.__table__.c.id
         
+        # The id tie-breaker keeps pages stable and matches the (user_id, sort, id) indexes
         if order == 'desc':
-            query = query.order_by(desc(sort_column))
+            query = query.order_by(desc(sort_column), desc(id_column))
         else:
-            query = query.order_by(sort_column)
+            query = query.order_by(sort_column, id_column)
         
         # Apply pagination
-        tasks_page = query.paginate(page=page, per_page=per_page, error_out=False)
+        if include_archived:
+            tasks_page = query.paginate(page=page, per_page=per_page, error_out=False)
+            return {
+                "tasks": [listed_task_to_dict(row) for row in tasks_page.items],
+                "pagination": {
+                    "total": tasks_page.total,
+                    "page": tasks_page.page,
+                    "per_page": tasks_page.per_page,
+                    "pages": tasks_page.pages,
+                    "has_next": tasks_page.has_next,
+                    "has_prev": tasks_page.has_prev
+                }
+            }
         
-        # Prepare response
+        rows, pagination = listing.paginate_rows(
+            query, page, per_page, listing.count_select(current_user.id, status, priority, category_id)
+        )
+        return {"tasks": [listing.row_to_dict(row) for row in rows], "pagination": pagination}
+    
+    return apply_validators(jsonify(get_tasks()), etag, last_modified), 200
+
+def api_get_tasks_by_cursor(current_user, namespaces, etag, last_modified,
+                            status, priority, category_id, per_page, sort, order, cursor,
+                            include_archived=False):
+    """
+    Keyset-paginated variant of api_get_tasks.
+    Pages are ordered by (sort column, id) and fetched with a range condition
+    instead of OFFSET. The total is only counted when include_total=true is
+    passed, and that count is cached separately from the pages.
+    """
+    if sort not in ('due_date', 'priority', 'created_at'):
+        sort = 'due_date'
+    if order != 'desc':
+        order = 'asc'
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    
+    archived_suffix = '_archived' if include_archived else ''
+    
+    @cache_data(
+        f'user_tasks_{current_user.id}_{status}_{priority}_{category_id}_cursor_{cursor}_{per_page}_{sort}_{order}'
+        + archived_suffix,
+        expire=300,
+        namespaces=namespaces,
+        lock=True,
+        early_beta=1.0
+    )
+    def get_tasks():
+        if include_archived:
+            query, columns = listing_query(current_user.id, status, priority, category_id)
+            sort_column = columns[Task.sort_column(sort).key]
+            tasks, next_cursor = keyset_page(query, columns, sort, sort_column, order, per_page, cursor)
+            tasks = [listed_task_to_dict(row) for row in tasks]
+        else:
+            query = listing.listing_select(current_user.id, status, priority, category_id)
+            tasks, next_cursor = keyset_page(
+                query, Task.__table__.c, sort, listing.sort_column(sort), order, per_page, cursor
+            )
+            tasks = [listing.row_to_dict(row) for row in tasks]
         return {
-            "tasks": [task.to_dict() for task in tasks_page.items],
+            "tasks": tasks,
             "pagination": {
-                "total": tasks_page.total,
-                "page": tasks_page.page,
-                "per_page": tasks_page.per_page,
-                "pages": tasks_page.pages,
-                "has_next": tasks_page.has_next,
-                "has_prev": tasks_page.has_prev
+                "per_page": per_page,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None
             }
         }
     
-    return jsonify(get_tasks()), 200
+    @cache_data(
+        f'user_tasks_count_{current_user.id}_{status}_{priority}_{category_id}' + archived_suffix,
+        expire=300,
+        namespaces=namespaces[:1]
+    )
+    def count_tasks():
+        if include_archived:
+            return listing_query(current_user.id, status, priority, category_id)[0].count()
+        return db.session.execute(listing.count_select(current_user.id, status, priority, category_id)).scalar()
+    
+    try:
+        result = get_tasks()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if include_total:
+        result = dict(result, pagination=dict(result["pagination"], total=count_tasks()))
+
+    return apply_validators(jsonify(result), etag, last_modified), 200
+
+@task_bp.route('/api/tasks/search', methods=['GET'])
+@query_budget(4)
+@token_required
+def api_search_tasks(current_user):
+    """
+    Full-text search over task titles and descriptions, best matches first.
+    Accepts the same status, priority and category_id filters as the task
+    list, and pages with the returned next_cursor.
+    """
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify({"error": "Search query 'q' is required"}), 400
+    if len(q) > 200:
+        return jsonify({"error": "Search query must be at most 200 characters"}), 400
+
+    status = request.args.get('status')
+    priority = request.args.get('priority')
+    category_id = request.args.get('category_id')
+    per_page = min(int(request.args.get('per_page', 20)), 100)
+    cursor = request.args.get('cursor')
+    namespaces = [f'user_tasks_{current_user.id}', f'user_categories_{current_user.id}']
+
+    etag, last_modified = compute_validators(current_user.id, namespaces, fallback=lambda: [
+        Task.data_version(current_user.id), Category.data_version(current_user.id)
+    ])
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    query_key = hashlib.sha1(q.encode('utf-8')).hexdigest()
+
+    @cache_data(
+        f'user_tasks_{current_user.id}_search_{query_key}_{status}_{priority}_{category_id}_{cursor}_{per_page}',
+        expire=300,
+        namespaces=namespaces,
+        lock=True
+    )
+    def get_results():
+        tasks, next_cursor = search_tasks(current_user.id, q, status, priority, category_id, per_page, cursor)
+        return {
+            "query": q,
+            "tasks": tasks,
+            "pagination": {
+                "per_page": per_page,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None
+            }
+        }
+
+    try:
+        result = get_results()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except SearchUnavailable as e:
+        return jsonify({"error": str(e)}), 501
+
+    return apply_validators(jsonify(result), etag, last_modified), 200
 
 @task_bp.route('/api/tasks', methods=['POST'])
+@query_budget(5)
 @token_required
 def api_create_task(current_user):
     """
@@ -384,7 +581,7 @@ def api_create_task(current_user):
         new_task = Task(
             title=data.get('title'),
             description=data.get('description', ''),
-            due_date=datetime.fromisoformat(data.get('due_date').replace('Z', '+00:00')),
+            due_date=parse_due_date(data.get('due_date')),
             priority=data.get('priority', 'medium'),
             status=data.get('status', 'pending'),
             user_id=current_user.id,
@@ -392,10 +589,14 @@ def api_create_task(current_user):
         )
         
         db.session.add(new_task)
+        db.session.flush()
+        task_id = new_task.id
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
+        # Update cache
+        new_task = Task.get_with_category(task_id)
+        task_data = new_task.to_dict()
+        refresh_task_cache(task_data)
         
         # Send Slack notification if enabled
         if current_app.config.get('SLACK_ENABLED', False) and hasattr(current_app, 'slack_notifier'):
@@ -403,7 +604,7 @@ def api_create_task(current_user):
         
         return jsonify({
             "message": "Task created successfully",
-            "task": new_task.to_dict()
+            "task": task_data
         }), 201
     except ValueError:
         return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"}), 400
@@ -415,13 +616,25 @@ def api_create_task(current_user):
         return jsonify({"error": f"Error creating task: {str(e)}"}), 500
 
 @task_bp.route('/api/tasks/<int:task_id>', methods=['GET'])
+@query_budget(4)
 @token_required
 def api_get_task(current_user, task_id):
     """Get a specific task by ID."""
+    # Write-through keeps task_<id> stable, so validate against the user's task generation
+    etag, last_modified = compute_validators(
+        current_user.id,
+        [f'user_tasks_{current_user.id}', f'user_categories_{current_user.id}'],
+        fallback=lambda: [Task.data_version(current_user.id), Category.data_version(current_user.id)]
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+    
     # Try to get from cache first
-    @cache_data(f'task_{task_id}', expire=300)
+    key, namespaces = task_cache_key(task_id, current_user.id)
+    
+    @cache_data(key, expire=300, namespaces=namespaces)
     def get_task():
-        task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
+        task = Task.query.filter_by(id=task_id, user_id=current_user.id).options(Task.eager_category()).first()
         if not task:
             return None
         return {"task": task.to_dict()}
@@ -430,49 +643,41 @@ def api_get_task(current_user, task_id):
     if not result:
         return jsonify({"error": "Task not found"}), 404
     
-    return jsonify(result), 200
+    return apply_validators(jsonify(result), etag, last_modified), 200
 
 @task_bp.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@query_budget(5)
 @token_required
 def api_update_task(current_user, task_id):
     """
     Update a specific task.
     """
-    task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-    
     data = request.get_json()
     if not data:
         return jsonify({"error": "No update data provided"}), 400
     
     try:
         # Update fields if provided
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        if 'due_date' in data:
-            task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00'))
-        if 'priority' in data:
-            task.priority = data['priority']
-        if 'status' in data:
-            task.status = data['status']
-        if 'category_id' in data:
-            task.category_id = data['category_id']
+        values = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
+        if 'due_date' in values:
+            values['due_date'] = parse_due_date(values['due_date'])
         
-        task.updated_at = datetime.utcnow()
+        task = update_task(current_user.id, task_id, values)
+        if task is None:
+            db.session.rollback()
+            return jsonify({"error": "Task not found"}), 404
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
-        invalidate_cache(f'task_{task_id}')
+        # Update cache
+        task_data = listing.row_to_dict(task)
+        refresh_task_cache(task_data)
         
         return jsonify({
             "message": "Task updated successfully",
-            "task": task.to_dict()
+            "task": task_data
         }), 200
     except ValueError:
+        db.session.rollback()
         return jsonify({"error": "Invalid date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"}), 400
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -482,6 +687,7 @@ def api_update_task(current_user, task_id):
         return jsonify({"error": f"Error updating task: {str(e)}"}), 500
 
 @task_bp.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@query_budget(4)
 @token_required
 def api_delete_task(current_user, task_id):
     """Delete a specific task."""
@@ -490,12 +696,12 @@ def api_delete_task(current_user, task_id):
         return jsonify({"error": "Task not found"}), 404
     
     try:
+        user_id = task.user_id
         db.session.delete(task)
         db.session.commit()
         
         # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
-        invalidate_cache(f'task_{task_id}')
+        bump_generation(f'user_tasks_{user_id}', f'task_{task_id}')
         
         return jsonify({"message": "Task deleted successfully"}), 200
     except SQLAlchemyError as e:
@@ -506,21 +712,20 @@ def api_delete_task(current_user, task_id):
         return jsonify({"error": f"Error deleting task: {str(e)}"}), 500
 
 @task_bp.route('/api/tasks/<int:task_id>/complete', methods=['POST'])
+@query_budget(4)
 @token_required
 def api_complete_task(current_user, task_id):
     """Mark a task as completed."""
-    task = Task.query.filter_by(id=task_id, user_id=current_user.id).first()
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
-    
     try:
-        task.status = 'completed'
-        task.updated_at = datetime.utcnow()
+        task = update_task(current_user.id, task_id, {'status': 'completed'})
+        if task is None:
+            db.session.rollback()
+            return jsonify({"error": "Task not found"}), 404
         db.session.commit()
         
-        # Invalidate cache
-        invalidate_cache(f'user_tasks_{current_user.id}')
-        invalidate_cache(f'task_{task_id}')
+        # Update cache
+        task_data = listing.row_to_dict(task)
+        refresh_task_cache(task_data)
         
         # Send Slack notification if enabled
         if current_app.config.get('SLACK_ENABLED', False) and hasattr(current_app, 'slack_notifier'):
@@ -528,11 +733,64 @@ def api_complete_task(current_user, task_id):
         
         return jsonify({
             "message": "Task marked as completed",
-            "task": task.to_dict()
+            "task": task_data
         }), 200
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": f"Database error: {str(e)}"}), 500
     except Exception as e:
         db.session.rollback()
-        return jsonify({"error": f"Error completing task: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Error completing task: {str(e)}"}), 500
+
+@task_bp.route('/api/tasks/batch', methods=['POST'])
+@query_budget(10)
+@token_required
+def api_batch_tasks(current_user):
+    """
+    Create, update, complete and delete many tasks in one request.
+    The batch is validated as a whole and applied in a single transaction:
+    if any operation is invalid, none are applied.
+    """
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else data
+    user_id = current_user.id
+    
+    try:
+        creates, changes, deletes, previous = validate_operations(
+            operations, user_id, current_app.config.get('TASK_BATCH_MAX_OPERATIONS', 500)
+        )
+        created_ids = apply_operations(creates, changes, deletes, user_id, previous)
+        db.session.commit()
+    except BatchValidationError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "results": e.errors}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    
+    # Serialize every written task with one query
+    written_ids = list(created_ids.values()) + [row['id'] for _, _, row in changes]
+    tasks = {}
+    if written_ids:
+        query = Task.query.options(Task.eager_category()).filter(Task.id.in_(written_ids))
+        tasks = {task.id: task.to_dict() for task in query}
+    
+    # Invalidate caches once for the whole batch
+    bump_generation(
+        f'user_tasks_{user_id}',
+        *(f'task_{row["id"]}' for _, _, row in changes),
+        *(f'task_{task_id}' for _, task_id in deletes)
+    )
+    
+    results = [
+        {"index": index, "op": "create", "status": 201, "task": tasks.get(created_ids[index])}
+        for index, _ in creates
+    ]
+    results += [{"index": index, "op": op, "status": 200, "task": tasks.get(row['id'])} for index, op, row in changes]
+    results += [{"index": index, "op": "delete", "status": 200, "id": task_id} for index, task_id in deletes]
+    results.sort(key=lambda result: result['index'])
+    
+    return jsonify({
+        "message": f"Applied {len(results)} operations",
+        "results": results
+    }), 200
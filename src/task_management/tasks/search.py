@@ -0,0 +1,114 @@
+# src/task_management/tasks/search.py
+"""
+Full-text search over task titles and descriptions.
+Postgres matches against the weighted tasks.search_vector column (GIN
+indexed) and ranks with ts_rank_cd; SQLite uses the tasks_fts FTS5 table and
+bm25. Both produce a score where higher is better, so results are paged with
+the same (score, id) keyset cursors on either database.
+"""
+import html
+import re
+from sqlalchemy import and_, func, literal_column, or_, table, column
+from src.task_management.db import db
+from .models import Task
+from .pagination import encode_cursor, decode_cursor
+
+# Private-use characters mark matches in the database so that the text can be
+# HTML-escaped before the markers are turned into <mark> tags
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+class SearchUnavailable(RuntimeError):
+    """
+    Raised when the database has no full-text search support.
+    """
+
+def _fts5_query(q):
+    """
+    Turn free text into an FTS5 query that ANDs quoted terms, so user input
+    can never be parsed as FTS5 syntax. The last term matches as a prefix.
+    """
+    terms = re.findall(r'\w+', q, re.UNICODE)
+    if not terms:
+        return None
+    quoted = ['"{}"'.format(term) for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+def _search_query(user_id, q, status, priority, category_id):
+    """
+    Build the filtered search query with (score, title highlight, description
+    snippet) columns. Returns (query, score expression), or (None, None) if q
+    contains nothing searchable.
+    """
+    dialect = db.session.get_bind().dialect.name
+    query = Task.filtered_query(user_id, status, priority, category_id)
+
+    if dialect == 'postgresql':
+        tsquery = func.websearch_to_tsquery('english', q)
+        vector = literal_column('tasks.search_vector')
+        options = f'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords=30, MinWords=10'
+        score = func.ts_rank_cd(vector, tsquery)
+        return query.filter(vector.op('@@')(tsquery)).add_columns(
+            score.label('score'),
+            func.ts_headline('english', Task.title, tsquery, f'{options}, HighlightAll=true'),
+            func.ts_headline('english', func.coalesce(Task.description, ''), tsquery, options)
+        ), score
+
+    if dialect == 'sqlite':
+        match = _fts5_query(q)
+        if match is None:
+            return None, None
+        fts = table('tasks_fts', column('rowid'))
+        fts_table = literal_column('tasks_fts')
+        # bm25 is lower for better matches; titles weigh more than descriptions
+        score = -func.bm25(fts_table, 10.0, 5.0)
+        return query.join(fts, fts.c.rowid == Task.id).filter(fts_table.op('MATCH')(match)).add_columns(
+            score.label('score'),
+            func.highlight(fts_table, 0, MATCH_START, MATCH_END),
+            func.snippet(fts_table, 1, MATCH_START, MATCH_END, '…', 24)
+        ), score
+
+    raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+
+def _mark(text):
+    """
+    HTML-escape highlighted text and wrap the matches in <mark> tags.
+    """
+    if not text:
+        return text
+    return html.escape(text).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+def search_tasks(user_id, q, status=None, priority=None, category_id=None, per_page=20, cursor=None):
+    """
+    Search a user's tasks, best matches first.
+    Returns (results, next_cursor), where each result is a task dict with
+    'score' and 'highlight' keys. Raises ValueError for an invalid cursor.
+    """
+    query, score = _search_query(user_id, q, status, priority, category_id)
+    if query is None:
+        return [], None
+
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, 'relevance', 'desc')
+        if not isinstance(last_score, (int, float)):
+            raise ValueError("Invalid cursor")
+        query = query.filter(or_(score < last_score, and_(score == last_score, Task.id < last_id)))
+
+    rows = query.options(Task.eager_category()).order_by(
+        score.desc(), Task.id.desc()
+    ).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last_task, last_score = rows[-1][0], rows[-1][1]
+        next_cursor = encode_cursor('relevance', 'desc', last_score, last_task.id)
+
+    results = []
+    for task, task_score, title, description in rows:
+        result = task.to_dict()
+        result['score'] = task_score
+        result['highlight'] = {"title": _mark(title), "description": _mark(description)}
+        results.append(result)
+    return results, next_cursor
@@ -0,0 +1,21 @@
+# tests/test_batch.py
+"""
+Tests for the batch API's field validation.
+"""
+from datetime import datetime
+import pytest
+from src.task_management.tasks.batch import _clean_fields
+from src.task_management.tasks.mutations import parse_due_date
+
+def test_due_date_with_offset_is_stored_as_utc():
+    values = _clean_fields({'title': 'Offset', 'due_date': '2021-01-01T10:00:00+05:00'}, required=True)
+    assert values['due_date'] == datetime(2021, 1, 1, 5, 0)
+    assert values['due_date'].tzinfo is None
+
+def test_due_date_matches_single_task_endpoints():
+    for due_date in ('2021-01-01T10:00:00+05:00', '2021-01-01T10:00:00Z', '2021-01-01T10:00:00'):
+        assert _clean_fields({'due_date': due_date})['due_date'] == parse_due_date(due_date)
+
+def test_invalid_due_date_is_rejected():
+    with pytest.raises(ValueError, match="Invalid date format"):
+        _clean_fields({'due_date': 'tomorrow'})